@@ -1,244 +1,23 @@
-<<<<<<< HEAD
+import time
 import streamlit as st
-import pandas as pd
-import numpy as np
-import os
+from modules.startup import background_load
 
-# === PAGE CONFIG ===
-st.set_page_config(page_title="Evolt Linear Optimiser", layout="wide")
-st.title("Evolt Linear Optimiser v4.8")
-
-# === SESSION STATE INITIALIZATION ===
-if 'ies_files' not in st.session_state:
-    st.session_state['ies_files'] = []
-if 'dataset' not in st.session_state:
-    st.session_state['dataset'] = {}
-
-# === DEFAULT DATASET LOAD ===
-default_excel_path = 'Linear_Data.xlsx'
-if os.path.exists(default_excel_path):
-    workbook = pd.ExcelFile(default_excel_path)
-    st.session_state['dataset'] = {
-        'LumCAT_Config': pd.read_excel(workbook, 'LumCAT_Config'),
-        'LED_and_Board_Config': pd.read_excel(workbook, 'LED_and_Board_Config'),
-        'ECG_Config': pd.read_excel(workbook, 'ECG_Config')
-    }
-else:
-    st.warning("⚠️ Default dataset not found! Please upload manually.")
-
-# === SIDEBAR ===
-with st.sidebar:
-    st.subheader("📁 Linear Data Upload")
-
-    uploaded_excel = st.file_uploader("Upload Data Excel", type=["xlsx"])
-    if uploaded_excel:
-        workbook = pd.ExcelFile(uploaded_excel)
-        st.session_state['dataset'] = {
-            'LumCAT_Config': pd.read_excel(workbook, 'LumCAT_Config'),
-            'LED_and_Board_Config': pd.read_excel(workbook, 'LED_and_Board_Config'),
-            'ECG_Config': pd.read_excel(workbook, 'ECG_Config')
-        }
-
-# === FILE UPLOAD: IES FILE ===
-uploaded_file = st.file_uploader("📄 Upload IES file", type=["ies"])
-if uploaded_file:
-    file_content = uploaded_file.read().decode('utf-8')
-    st.session_state['ies_files'] = [{'name': uploaded_file.name, 'content': file_content}]
-
-# === PARSE FUNCTIONS ===
-def parse_ies_file(file_content):
-    lines = file_content.splitlines()
-    header_lines, data_lines = [], []
-    reading_data = False
-    for line in lines:
-        stripped = line.strip()
-        if stripped.startswith("TILT"):
-            reading_data = True
-        elif not reading_data:
-            header_lines.append(stripped)
-        else:
-            data_lines.append(stripped)
-
-    photometric_raw = " ".join(data_lines[:2]).split()
-    photometric_params = [float(x) if '.' in x or 'e' in x.lower() else int(x) for x in photometric_raw]
-    n_vert = int(photometric_params[3])
-    n_horz = int(photometric_params[4])
-
-    remaining_data = " ".join(data_lines[2:]).split()
-    vertical_angles = [float(x) for x in remaining_data[:n_vert]]
-    horizontal_angles = [float(x) for x in remaining_data[n_vert:n_vert + n_horz]]
-
-    candela_values = remaining_data[n_vert + n_horz:]
-    candela_matrix = []
-    idx = 0
-    for _ in range(n_horz):
-        row = [float(candela_values[idx + i]) for i in range(n_vert)]
-        candela_matrix.append(row)
-        idx += n_vert
-
-    return header_lines, photometric_params, vertical_angles, horizontal_angles, candela_matrix
-
-def corrected_simple_lumen_calculation(vertical_angles, horizontal_angles, candela_matrix, symmetry_factor=4):
-    vert_rad = np.radians(vertical_angles)
-    delta_vert = np.diff(vert_rad)
-    delta_vert = np.append(delta_vert, delta_vert[-1])
-
-    symmetry_range_rad = np.radians(horizontal_angles[-1] - horizontal_angles[0])
-    num_horz_segments = len(horizontal_angles)
-    uniform_delta_horz = symmetry_range_rad / num_horz_segments
-
-    total_flux = 0.0
-    for h_idx in range(num_horz_segments):
-        candela_row = candela_matrix[h_idx]
-        for v_idx, cd in enumerate(candela_row):
-            theta = vert_rad[v_idx]
-            d_theta = delta_vert[v_idx]
-            flux = cd * np.sin(theta) * d_theta * uniform_delta_horz
-            total_flux += flux
-
-    return round(total_flux * symmetry_factor, 1)
-
-# === LUMCAT PARSE FUNCTIONS ===
-def parse_lumcat(lumcat_code):
-    try:
-        range_code, rest = lumcat_code.split('-')
-
-        parsed = {
-            "Range": range_code,
-            "Option Code": rest[0:2],
-            "Diffuser Code": rest[2:4],
-            "Wiring Code": rest[4],
-            "Driver Code": rest[5:7],
-            "Lumens Code": rest[7:10],
-            "CRI Code": rest[10:12],
-            "CCT Code": rest[12:14],
-        }
-
-        parsed['Lumens Derived Display'] = round(float(parsed["Lumens Code"]) * 10, 1)
-
-        return parsed
-
-    except Exception as e:
-        st.error(f"Error parsing LUMCAT: {e}")
-        return None
-
-def lookup_lumcat_descriptions(parsed_codes, matrix_df):
-    if matrix_df.empty or parsed_codes is None:
-        return None
-
-    matrix_df.columns = matrix_df.columns.str.strip()
-    matrix_df['CRI Code'] = matrix_df['CRI Code'].astype(str).str.strip()
-    matrix_df['CCT/Colour Code'] = matrix_df['CCT/Colour Code'].astype(str).str.strip()
-
-    parsed_codes['CRI Code'] = str(parsed_codes['CRI Code']).strip()
-    parsed_codes['CCT Code'] = str(parsed_codes['CCT Code']).strip()
-
-    result = {}
-    result['Range'] = parsed_codes['Range']
-
-    option_match = matrix_df.loc[matrix_df['Option Code'] == parsed_codes['Option Code']]
-    diffuser_match = matrix_df.loc[matrix_df['Diffuser / Louvre Code'] == parsed_codes['Diffuser Code']]
-    wiring_match = matrix_df.loc[matrix_df['Wiring Code'] == parsed_codes['Wiring Code']]
-    driver_match = matrix_df.loc[matrix_df['Driver Code'] == parsed_codes['Driver Code']]
-    cri_match = matrix_df.loc[matrix_df['CRI Code'] == parsed_codes['CRI Code']]
-    cct_match = matrix_df.loc[matrix_df['CCT/Colour Code'] == parsed_codes['CCT Code']]
-
-    result['Option Description'] = option_match['Option Description'].values[0] if not option_match.empty else "⚠️ Not Found"
-    result['Diffuser Description'] = diffuser_match['Diffuser / Louvre Description'].values[0] if not diffuser_match.empty else "⚠️ Not Found"
-    result['Wiring Description'] = wiring_match['Wiring Description'].values[0] if not wiring_match.empty else "⚠️ Not Found"
-    result['Driver Description'] = driver_match['Driver Description'].values[0] if not driver_match.empty else "⚠️ Not Found"
-    result['Lumens (Display Only)'] = f"{parsed_codes['Lumens Derived Display']} lm"
-    result['CRI Description'] = cri_match['CRI Description'].values[0] if not cri_match.empty else "⚠️ Not Found"
-    result['CCT Description'] = cct_match['CCT/Colour Description'].values[0] if not cct_match.empty else "⚠️ Not Found"
-
-    return result
-
-# === MAIN DISPLAY ===
-if st.session_state['ies_files']:
-    ies_file = st.session_state['ies_files'][0]
-    header_lines, photometric_params, vertical_angles, horizontal_angles, candela_matrix = parse_ies_file(
-        ies_file['content']
-    )
-
-    calculated_lumens = corrected_simple_lumen_calculation(vertical_angles, horizontal_angles, candela_matrix)
-    input_watts = photometric_params[12]
-    length_m = photometric_params[8]
+# pandas, NumPy and the photometry modules are imported on first use below so the splash and uploader render first
+SPLASH_PATH = 'Assets/splash_screen.png'
+SPLASH_SECONDS = 0.5
+DATASET_MAX_AGE_S = 600  # Sheet edits show up after at most this long, or on 'Reload data'
+DATASET_WAIT_S = 30  # longest the IES view blocks on the dataset before falling back to the status poll
 
-    base_lm_per_watt = round(calculated_lumens / input_watts, 1) if input_watts > 0 else 0
-    base_lm_per_m = round(calculated_lumens / length_m, 1) if length_m > 0 else 0
-
-    default_led_df = st.session_state['dataset']['LED_and_Board_Config']
-    default_led = default_led_df.iloc[0]
-
-    default_tier = default_led['Default Tier']
-    chip_name = default_led['Chip Name']
-    max_led_load_ma = default_led['Max LED Load (mA)']
-    internal_code_tm30 = default_led['Internal Code / TM30']
-    led_pitch_mm = default_led['Board Segment LED Pitch (mm) [LB15]']
-    led_strip_voltage = default_led['LED Strip Voltage (SELV)']
-
-    actual_led_current_ma = round((input_watts / led_strip_voltage) / led_pitch_mm * 1000, 1)
-
-    with st.expander("📏 Parameters + Metadata + Derived Values", expanded=False):
-        meta_dict = {line.split(']')[0] + "]": line.split(']')[-1].strip() for line in header_lines if ']' in line}
-
-        st.markdown("#### IES Metadata")
-        st.table(pd.DataFrame.from_dict(meta_dict, orient='index', columns=['Value']))
-
-        st.markdown("#### IES Parameters")
-        photometric_table = [
-            {"Description": "Lamps", "Value": f"{photometric_params[0]}"},
-            {"Description": "Lumens/Lamp", "Value": f"{photometric_params[1]}"},
-            {"Description": "Candela Mult.", "Value": f"{photometric_params[2]}"},
-            {"Description": "Vert Angles", "Value": f"{photometric_params[3]}"},
-            {"Description": "Horiz Angles", "Value": f"{photometric_params[4]}"},
-            {"Description": "Photometric Type", "Value": f"{photometric_params[5]}"},
-            {"Description": "Units Type", "Value": f"{photometric_params[6]}"},
-            {"Description": "Width (m)", "Value": f"{photometric_params[7]}"},
-            {"Description": "Length (m)", "Value": f"{photometric_params[8]}"},
-            {"Description": "Height (m)", "Value": f"{photometric_params[9]}"},
-            {"Description": "Ballast Factor", "Value": f"{photometric_params[10]}"},
-            {"Description": "Future Use", "Value": f"{photometric_params[11]}"},
-            {"Description": "Input Watts [F]", "Value": f"{photometric_params[12]}"}
-        ]
-        st.table(pd.DataFrame(photometric_table))
-
-        st.markdown("#### IES Derived Values")
-        base_values = [
-            {"Description": "Total Lumens", "LED Base": f"{calculated_lumens:.1f}"},
-            {"Description": "Efficacy (lm/W)", "LED Base": f"{base_lm_per_watt:.1f}"},
-            {"Description": "Lumens per Meter", "LED Base": f"{base_lm_per_m:.1f}"},
-            {"Description": "Default Tier / Chip", "LED Base": f"{default_tier} / {chip_name}"},
-            {"Description": "Max LED Load (mA)", "LED Base": f"{max_led_load_ma:.1f}"},
-            {"Description": "LED Pitch (mm)", "LED Base": f"{led_pitch_mm:.1f}"},
-            {"Description": "Actual LED Current (mA)", "LED Base": f"{actual_led_current_ma:.1f}"},
-            {"Description": "TM30 Code", "LED Base": f"{internal_code_tm30}"}
-        ]
-        st.table(pd.DataFrame(base_values))
-
-        st.markdown("#### 🔎 LumCAT Lookup")
-        lumcat_matrix_df = st.session_state['dataset']['LumCAT_Config']
-        lumcat_from_meta = meta_dict.get("[LUMCAT]", "")
-
-        lumcat_input = st.text_input("Enter LumCAT Code", value=lumcat_from_meta)
-
-        if lumcat_input:
-            parsed_codes = parse_lumcat(lumcat_input)
-            if parsed_codes:
-                lumcat_desc = lookup_lumcat_descriptions(parsed_codes, lumcat_matrix_df)
-                if lumcat_desc:
-                    st.table(pd.DataFrame(lumcat_desc.items(), columns=["Field", "Value"]))
+st.set_page_config(page_title="Evolt Linear Optimiser", layout="wide")
 
-# === FOOTER ===
-st.caption("Version 4.8 - Unified Base Info + LumCAT Lookup + Confirmed Dataset")
-=======
-import streamlit as st
-import pandas as pd
-from modules.google_sheets import load_google_sheet_data, get_tooltip
-from modules.ies_parser import parse_ies_file, corrected_simple_lumen_calculation, extract_meta_dict
-from modules.lumcat import parse_lumcat, lookup_lumcat_descriptions
+# === SPLASH ===
+splash = st.empty()
+splash_started = None
+if not st.session_state.get('splash_shown'):
+    st.session_state['splash_shown'] = True
+    splash.image(SPLASH_PATH, width=320)
+    splash_started = time.monotonic()
 
-st.set_page_config(page_title="Evolt Linear Optimiser", layout="wide")
 st.title("Evolt Linear Optimiser v5 - Google Sheets Edition")
 
 # === SESSION STATE ===
@@ -247,18 +26,93 @@ if 'ies_files' not in st.session_state:
 if 'dataset' not in st.session_state:
     st.session_state['dataset'] = {}
 
-# === LOAD DATA ===
-load_google_sheet_data()
-
 # === FILE UPLOAD ===
-uploaded_file = st.file_uploader("📄 Upload IES file", type=["ies"])
-if uploaded_file:
-    file_content = uploaded_file.read().decode('utf-8')
-    st.session_state['ies_files'] = [{'name': uploaded_file.name, 'content': file_content}]
+uploaded_file = st.file_uploader("📄 Upload IES, LDT or optimiser ZIP", type=["ies", "ldt", "zip"])
+
+# the uploader returns the same file on every rerun: only import it once per upload
+if uploaded_file and st.session_state.get('upload_id') != uploaded_file.file_id:
+    st.session_state['upload_id'] = uploaded_file.file_id
+    st.session_state['import_summary'] = None
+    if uploaded_file.name.lower().endswith('.zip'):
+        import zipfile
+        from modules.bundle import import_bundle
+
+        try:
+            entries = import_bundle(uploaded_file.getvalue())
+        except (zipfile.BadZipFile, ValueError) as e:
+            st.session_state['upload_id'] = None
+            st.error(f"❌ Could not import the ZIP: {e}")
+            st.stop()
+        if not entries:
+            st.session_state['upload_id'] = None
+            st.error("❌ No IES files found in the ZIP")
+            st.stop()
+        st.session_state['ies_files'] = [
+            {'name': e.name, 'content': e.raw, 'photometry': e.photometry, 'manifest': e.manifest} for e in entries
+        ]
+        cached = sum(e.status == 'cached' for e in entries)
+        st.session_state['import_summary'] = f"Re-imported {len(entries)} files ({cached} from manifest, {len(entries) - cached} re-parsed)"
+    else:
+        from modules.ies_parser import decode_ies_bytes, write_ies
+
+        file_content = decode_ies_bytes(uploaded_file.read())
+        if uploaded_file.name.lower().endswith('.ldt'):
+            from modules.eulumdat import ldt_to_photometry
+
+            file_content = write_ies(ldt_to_photometry(file_content))
+        st.session_state['ies_files'] = [{'name': uploaded_file.name, 'content': file_content}]
+
+if uploaded_file and st.session_state.get('import_summary'):
+    st.caption(st.session_state['import_summary'])
+
+# === LOAD DATA (BACKGROUND) ===
+def _fetch_dataset():
+    from modules.google_sheets import fetch_google_sheet_data
+    return fetch_google_sheet_data()
+
+dataset_load = background_load('google_sheets', _fetch_dataset, max_age=DATASET_MAX_AGE_S)
+if st.session_state['ies_files'] and not dataset_load.ready:
+    # the IES view needs the data: wait here so the status below reflects the outcome
+    with st.spinner("Waiting for Google Sheets data..."):
+        dataset_load.join(DATASET_WAIT_S)
+
+@st.fragment(run_every=None if dataset_load.ready else 0.5)
+def dataset_status(was_ready: bool) -> None:
+    if not dataset_load.ready:
+        st.caption("⏳ Loading Google Sheets data...")
+    elif dataset_load.error is not None:
+        # a failed load is kept until 'Reload data' or the retry backoff, so rerunning here would not refetch anyway
+        st.error(f"❌ Failed to load dataset: {dataset_load.error}")
+    elif not was_ready:
+        st.rerun()  # finished while polling: rerun the app once so it picks the data up and stops polling
+    else:
+        st.caption(f"✅ Successfully loaded Google Sheets data ({dataset_load.elapsed:.1f} s, "
+                   f"refreshed every {DATASET_MAX_AGE_S // 60:.0f} min)")
+    if dataset_load.ready and st.button("🔄 Reload data"):
+        background_load('google_sheets', _fetch_dataset, reload=True)
+        st.rerun()
+
+dataset_status(dataset_load.ready)
 
 # === MAIN DISPLAY ===
 if st.session_state['ies_files']:
+    import pandas as pd
+    from modules.ies_parser import parse_ies_file, corrected_simple_lumen_calculation, extract_meta_dict, parse_ies_arrays, write_ies
+    from modules.lumcat import parse_lumcat
+    from modules.config_registry import ConfigError, get_registry
+    from modules.tolerance import DEFAULT_DRIVER_EFFICIENCY, ToleranceConfig, tolerance_table
+    from modules.bundle import BundleEntry, export_bundle
+
+    if not dataset_load.ready:
+        st.warning("⏳ Google Sheets data is taking longer than usual; the view will appear once it has loaded")
+        st.stop()
+    if dataset_load.error is not None:
+        st.stop()  # the status above already shows the load error; nothing below works without the dataset
+    st.session_state['dataset'] = dataset_load.result
+
     ies_file = st.session_state['ies_files'][0]
+    if ies_file['content'] is None:
+        ies_file['content'] = write_ies(ies_file['photometry'])  # rehydrated from a bundle manifest
     header_lines, photometric_params, vertical_angles, horizontal_angles, candela_matrix = parse_ies_file(ies_file['content'])
 
     # === LUMEN CALCULATIONS ===
@@ -270,20 +124,21 @@ if st.session_state['ies_files']:
     base_lm_per_m = round(calculated_lumens / length_m, 1) if length_m > 0 else 0
 
     # === BUILD DATA LOOKUP ===
-    build_data = st.session_state['dataset']['Build_Data']
-    if 'Description' in build_data.columns:
-        build_data = build_data.set_index('Description')
-    else:
-        st.error("The 'Description' column is missing in Build_Data")
+    try:
+        registry = get_registry(st.session_state['dataset'], source=dataset_load)
+        st.session_state['registry'] = (st.session_state['dataset'], registry)  # reused by get_tooltip
+        tier_config = registry.tier('V1')
+    except (ConfigError, KeyError) as e:
+        st.error(f"❌ Build_Data configuration error: {e}")
+        st.stop()
 
-    default_tier = 'V1'
     tier_values = {
-        "Default Tier": default_tier,
-        "Chip Name": build_data.loc['Chip_Name', default_tier],
-        "Max LED Load (mA)": build_data.loc['LED_Load_(mA)', default_tier],
-        "Board Segment LED Pitch": build_data.loc['LED_Group_Pitch_(mm)', default_tier],
-        "Vf (Volts)": build_data.loc['Vf_(Volts)', default_tier],
-        "Internal Code / TM30": build_data.loc['TM30-report_No.', default_tier]
+        "Default Tier": tier_config.tier,
+        "Chip Name": tier_config.chip_name,
+        "Max LED Load (mA)": tier_config.max_led_load_ma,
+        "Board Segment LED Pitch": tier_config.led_pitch_mm,
+        "Vf (Volts)": tier_config.vf_volts,
+        "Internal Code / TM30": tier_config.tm30_code
     }
 
     actual_led_current_ma = (input_watts / tier_values['Vf (Volts)']) * 1000
@@ -320,18 +175,78 @@ if st.session_state['ies_files']:
         ]
         st.table(pd.DataFrame(base_values))
 
+        # === TOLERANCE ANALYSIS ===
+        if st.checkbox("Show tolerance analysis (P5 / P50 / P95)"):
+            ecg = registry.ecg_for_tier(tier_values['Default Tier']) or registry.default_ecg()
+            tolerance_config = ToleranceConfig(
+                lumens=calculated_lumens,
+                input_watts=input_watts,
+                vf_volts=tier_values['Vf (Volts)'],
+                driver_efficiency=ecg.efficiency if ecg and ecg.efficiency else DEFAULT_DRIVER_EFFICIENCY
+            )
+            st.table(tolerance_table({tier_values['Default Tier']: tolerance_config}))
+
         # === LUMCAT LOOKUP ===
         st.markdown("#### 🔎 LumCAT Lookup")
-        lumcat_matrix_df = st.session_state['dataset']['LumCAT_Config']
         lumcat_from_meta = meta_dict.get("[LUMCAT]", "")
 
         lumcat_input = st.text_input("Enter LumCAT Code", value=lumcat_from_meta)
         if lumcat_input:
             parsed_codes = parse_lumcat(lumcat_input)
             if parsed_codes:
-                lumcat_desc = lookup_lumcat_descriptions(parsed_codes, lumcat_matrix_df)
+                lumcat_desc = registry.describe_lumcat(parsed_codes)
                 if lumcat_desc:
                     st.table(pd.DataFrame(lumcat_desc.items(), columns=["Field", "Value"]))
 
+    # === LIGHT DISTRIBUTION ===
+    from modules.plots import DEFAULT_C_PLANES, render_heatmap, render_polar
+
+    if ies_file.get('photometry') is None:
+        ies_file['photometry'] = parse_ies_arrays(ies_file['content'])
+    base_photometry = ies_file['photometry']
+    with st.expander("📈 Light Distribution", expanded=True):
+        plane_options = sorted({float(c) for c in base_photometry.horizontal_angles} | set(DEFAULT_C_PLANES))
+        c_planes = st.multiselect("C-planes", plane_options, default=list(DEFAULT_C_PLANES), key='c_planes',
+                                  format_func=lambda c: f"C{c:g}")
+        other_files = [f['name'] for f in st.session_state['ies_files'][1:]]
+        overlay_names = st.multiselect("Overlay files", other_files, key='overlay_files') if other_files else []
+        overlays = {}
+        for f in st.session_state['ies_files'][1:]:
+            if f['name'] in overlay_names:
+                if f.get('photometry') is None:
+                    f['photometry'] = parse_ies_arrays(f['content'])
+                overlays[f['name']] = f['photometry']
+
+        polar_col, heatmap_col = st.columns(2)
+        if c_planes:
+            polar_col.image(render_polar(base_photometry, c_planes, overlays), caption="Polar candela distribution")
+        heatmap_col.image(render_heatmap(base_photometry), caption="Candela by C-plane and gamma")
+
+    # === EXPORT ===
+    # built on request and kept per upload, so widget reruns never re-parse or re-deflate the bundle
+    export = st.session_state.get('export_zip')
+    if export is None or export[0] != st.session_state.get('upload_id'):
+        export = None
+        if st.button("📦 Prepare ZIP (IES + Summary CSV)"):
+            bundle_entries = []
+            for f in st.session_state['ies_files']:
+                manifest = f.get('manifest', {})
+                bundle_entries.append(BundleEntry(
+                    name=f['name'] if f['name'].lower().endswith('.ies') else f"{f['name'].rsplit('.', 1)[0]}.ies",
+                    photometry=f.get('photometry') or parse_ies_arrays(f['content']),
+                    base_file=manifest.get('base_file', f['name']),
+                    gain_pct=manifest.get('gain_pct', 0.0),
+                    reason=manifest.get('reason', ""),
+                    length_m=manifest.get('length_m'),
+                ))
+            export = st.session_state['export_zip'] = (st.session_state.get('upload_id'), export_bundle(bundle_entries))
+    if export is not None:
+        st.download_button("⬇️ Download ZIP (IES + Summary CSV)", export[1],
+                           file_name="linear_optimiser_export.zip", mime="application/zip")
+
 st.caption("Version 5 - Google Sheets Connected - Tooltips Added")
->>>>>>> 450ad29c8db94fc3add626373016df17f93bac17
+
+# === SPLASH (CLEAR) ===
+if splash_started is not None:
+    time.sleep(max(0.0, SPLASH_SECONDS - (time.monotonic() - splash_started)))
+    splash.empty()
@@ -0,0 +1,62 @@
+"""Time-to-first-render benchmark for app.py.
+
+Runs the app headless with Streamlit's AppTest in a fresh interpreter (so every import is cold), with no file
+uploaded, and fails if the first script run takes longer than the budget. The 0.5 s splash pause is excluded;
+the background dataset load is not awaited, which is the point: it must not block the first render.
+
+    python benchmarks/startup_time.py [--budget 0.5] [--runs 3]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_BUDGET_S = 0.5
+
+_CHILD = """
+import json, time
+from streamlit.testing.v1 import AppTest
+
+at = AppTest.from_file('app.py', default_timeout=30)
+at.session_state['splash_shown'] = True  # measure rendering, not the deliberate splash pause
+start = time.perf_counter()
+at.run()
+elapsed = time.perf_counter() - start
+print(json.dumps({
+    "seconds": elapsed,
+    "exception": [str(e.value) for e in at.exception],
+    "uploader": len(at.get('file_uploader')),
+}))
+"""
+
+
+def measure_once() -> dict:
+    result = subprocess.run([sys.executable, "-c", _CHILD], cwd=REPO_ROOT, capture_output=True, text=True, check=True)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Assert app.py time-to-first-render stays under a budget")
+    parser.add_argument("--budget", type=float, default=DEFAULT_BUDGET_S, help="Seconds allowed for the median first render")
+    parser.add_argument("--runs", type=int, default=3, help="Cold runs (each in a new interpreter)")
+    args = parser.parse_args(argv)
+
+    runs = [measure_once() for _ in range(args.runs)]
+    for run in runs:
+        if run["exception"]:
+            sys.exit(f"app.py raised during first render: {run['exception']}")
+        if not run["uploader"]:
+            sys.exit("file uploader was not rendered on first run")
+
+    median = statistics.median(r["seconds"] for r in runs)
+    print(f"time to first render: median {median:.3f} s over {args.runs} cold runs "
+          f"(min {min(r['seconds'] for r in runs):.3f} s, budget {args.budget:.3f} s)")
+    if median > args.budget:
+        sys.exit(f"FAIL: first render {median:.3f} s exceeds budget {args.budget:.3f} s")
+
+
+if __name__ == "__main__":
+    main()
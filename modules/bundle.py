@@ -0,0 +1,151 @@
+import hashlib
+import io
+import json
+import zipfile
+import zlib
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, BinaryIO, Dict, List, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+from modules.ies_parser import Photometry, decode_ies_bytes, parse_ies_arrays, photometry_lumens, write_ies
+
+MANIFEST_NAME = 'manifest.json'
+ARRAYS_NAME = 'photometry_arrays.npz'
+SUMMARY_NAME = 'summary.csv'
+MANIFEST_VERSION = 1
+
+
+@dataclass
+class BundleEntry:
+    name: str
+    photometry: Photometry
+    base_file: str = ""
+    gain_pct: float = 0.0
+    reason: str = ""
+    length_m: Optional[float] = None
+
+
+@dataclass
+class ImportedEntry:
+    name: str
+    photometry: Photometry
+    status: str  # 'cached' (rehydrated from manifest), 'reparsed' (changed), 'new' (not in manifest)
+    manifest: Dict[str, Any] = field(default_factory=dict)
+    raw: Optional[str] = None  # file text, only read for re-parsed entries
+
+    @property
+    def content(self) -> str:
+        # a cached entry's CRC matched the export, so write_ies reproduces the file byte for byte
+        return self.raw if self.raw is not None else write_ies(self.photometry)
+
+
+# === EXPORT ===
+def export_bundle(entries: List[BundleEntry]) -> bytes:
+    """ZIP of IES files + summary.csv, with a manifest and flat candela arrays for fast re-import."""
+    manifest_entries = []
+    vertical, horizontal, candela = [], [], []
+    offsets = {"v": 0, "h": 0, "cd": 0}
+    summary_rows = []
+
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as archive:
+        for entry in entries:
+            photometry = entry.photometry
+            data = write_ies(photometry).encode('utf-8')
+            archive.writestr(entry.name, data)
+
+            lumens = photometry_lumens(photometry)
+            manifest_entries.append({
+                "name": entry.name,
+                "sha1": hashlib.sha1(data).hexdigest(),
+                "crc32": zlib.crc32(data),
+                "size": len(data),
+                "base_file": entry.base_file,
+                "gain_pct": entry.gain_pct,
+                "reason": entry.reason,
+                "length_m": entry.length_m if entry.length_m is not None else photometry.length_m,
+                "lumens": lumens,
+                "header_lines": photometry.header_lines,
+                "tilt": photometry.tilt,
+                "tilt_lines": photometry.tilt_lines,
+                "photometric_params": photometry.photometric_params,
+                "v_offset": offsets["v"], "h_offset": offsets["h"], "cd_offset": offsets["cd"],
+            })
+            vertical.append(photometry.vertical_angles)
+            horizontal.append(photometry.horizontal_angles)
+            candela.append(photometry.candela.ravel())
+            offsets["v"] += photometry.vertical_angles.size
+            offsets["h"] += photometry.horizontal_angles.size
+            offsets["cd"] += photometry.candela.size
+
+            summary_rows.append({
+                "File": entry.name, "Base File": entry.base_file, "Length (m)": manifest_entries[-1]["length_m"],
+                "LED Efficiency Gain (%)": entry.gain_pct, "Reason": entry.reason, "Total Lumens": lumens,
+                "Input Watts": photometry.input_watts,
+                "Efficacy (lm/W)": round(lumens / photometry.input_watts, 1) if photometry.input_watts > 0 else 0,
+            })
+
+        arrays = io.BytesIO()
+        np.savez(arrays,
+                 vertical=np.concatenate(vertical) if vertical else np.empty(0),
+                 horizontal=np.concatenate(horizontal) if horizontal else np.empty(0),
+                 candela=np.concatenate(candela) if candela else np.empty(0))
+        # stored, not deflated: the arrays are read straight back without a decompression pass
+        archive.writestr(ARRAYS_NAME, arrays.getvalue(), compress_type=zipfile.ZIP_STORED)
+        archive.writestr(SUMMARY_NAME, pd.DataFrame(summary_rows).to_csv(index=False))
+        archive.writestr(MANIFEST_NAME, json.dumps({
+            "version": MANIFEST_VERSION,
+            "exported": datetime.now().isoformat(timespec='seconds'),
+            "entries": manifest_entries,
+        }))
+    return buffer.getvalue()
+
+
+# === IMPORT ===
+def _rehydrate(meta: Dict[str, Any], arrays: Dict[str, np.ndarray]) -> Photometry:
+    params = meta["photometric_params"]
+    n_vert, n_horz = int(params[3]), int(params[4])
+    v, h, cd = meta["v_offset"], meta["h_offset"], meta["cd_offset"]
+    return Photometry(
+        meta["header_lines"], meta["tilt"], params,
+        arrays["vertical"][v:v + n_vert],
+        arrays["horizontal"][h:h + n_horz],
+        arrays["candela"][cd:cd + n_vert * n_horz].reshape(n_horz, n_vert),
+        meta.get("tilt_lines", []),
+    )
+
+
+def import_bundle(source: Union[str, bytes, BinaryIO], verify: bool = False) -> List[ImportedEntry]:
+    """Re-open an exported ZIP: unchanged entries (CRC/size match, or SHA-1 with verify=True) skip parsing."""
+    if isinstance(source, bytes):
+        source = io.BytesIO(source)
+
+    imported = []
+    with zipfile.ZipFile(source) as archive:
+        names = set(archive.namelist())
+        manifest: Dict[str, Dict[str, Any]] = {}
+        arrays: Dict[str, np.ndarray] = {}
+        if MANIFEST_NAME in names and ARRAYS_NAME in names:
+            manifest = {e["name"]: e for e in json.loads(archive.read(MANIFEST_NAME))["entries"]}
+            with np.load(io.BytesIO(archive.read(ARRAYS_NAME))) as npz:
+                arrays = {key: npz[key] for key in ("vertical", "horizontal", "candela")}
+
+        for info in archive.infolist():
+            if not info.filename.lower().endswith('.ies'):
+                continue
+            meta = manifest.get(info.filename)
+            # the central directory already carries CRC and size, so unchanged members are never decompressed
+            unchanged = meta is not None and info.CRC == meta["crc32"] and info.file_size == meta["size"]
+            if unchanged and verify:
+                unchanged = hashlib.sha1(archive.read(info)).hexdigest() == meta["sha1"]
+
+            if unchanged:
+                imported.append(ImportedEntry(info.filename, _rehydrate(meta, arrays), 'cached', meta))
+            else:
+                content = decode_ies_bytes(archive.read(info))
+                imported.append(ImportedEntry(info.filename, parse_ies_arrays(content), 'new' if meta is None else 'reparsed',
+                                              meta or {}, content))
+    return imported
@@ -0,0 +1,184 @@
+import argparse
+import csv
+import itertools
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from modules.config_registry import ConfigRegistry, get_registry
+from modules.dataset import DEFAULT_EXCEL_PATH, load_excel_dataset
+from modules.ies_parser import Photometry, decode_ies_bytes, extract_meta_dict, parse_ies_arrays, photometry_lumens, write_ies
+
+# (parse_lumcat key, code width) in catalogue-number order; anything after CCT is carried through as a suffix
+LUMCAT_LAYOUT = (
+    ('Option Code', 2), ('Diffuser Code', 2), ('Wiring Code', 1), ('Driver Code', 2),
+    ('Lumens Code', 3), ('CRI Code', 2), ('CCT Code', 2),
+)
+# Fields that change the light distribution; the rest only change the catalogue number
+PHOTOMETRIC_FIELDS = ('Diffuser Code', 'Lumens Code', 'CRI Code', 'CCT Code')
+WILDCARD = '_'
+INDEX_COLUMNS = ['LumCAT', 'Photometry LumCAT', 'IES File', 'Total Lumens', 'Input Watts', 'Efficacy (lm/W)']
+
+
+def split_lumcat(lumcat_code: str) -> Tuple[str, Dict[str, str], str]:
+    """(range, {field: code}, suffix); unlike lumcat.parse_lumcat this keeps wildcards and never touches the UI."""
+    range_code, rest = lumcat_code.strip().split('-', 1)
+    codes, pos = {}, 0
+    for field, width in LUMCAT_LAYOUT:
+        codes[field] = rest[pos:pos + width]
+        pos += width
+    return range_code, codes, rest[pos:]
+
+
+def join_lumcat(range_code: str, codes: Dict[str, str], suffix: str) -> str:
+    return f"{range_code}-{''.join(codes[field] for field, _ in LUMCAT_LAYOUT)}{suffix}"
+
+
+def is_wildcard(code: str) -> bool:
+    return set(code) == {WILDCARD}
+
+
+# === BASE FILES ===
+def load_base_files(base_dir: str, range_code: str) -> List[Tuple[str, str]]:
+    """(file path, base LumCAT) for every IES file in base_dir whose [LUMCAT] belongs to the range."""
+    bases = []
+    for filename in sorted(os.listdir(base_dir)):
+        if not filename.lower().endswith('.ies'):
+            continue
+        path = os.path.join(base_dir, filename)
+        with open(path, 'rb') as f:
+            header = decode_ies_bytes(f.read(4096)).split('TILT', 1)[0]
+        lumcat = extract_meta_dict(header.splitlines()).get('[LUMCAT]', '')
+        if lumcat.startswith(f"{range_code}-"):
+            bases.append((path, lumcat))
+    return bases
+
+
+def allowed_codes(registry: ConfigRegistry, filters: Dict[str, Sequence[str]]) -> Dict[str, List[str]]:
+    allowed = {}
+    for field, width in LUMCAT_LAYOUT:
+        codes = filters.get(field)
+        if codes is None:
+            codes = [c for c in registry.lumcat_codes.get(field, {}) if len(c) == width]
+        allowed[field] = list(codes)
+    return allowed
+
+
+# === PHOTOMETRY JOBS (RUN IN THE PROCESS POOL) ===
+def _retitle(header_lines: List[str], lumcat: str, input_watts: float) -> List[str]:
+    lines = []
+    for line in header_lines:
+        if line.startswith('[LUMCAT]'):
+            line = f"[LUMCAT] {lumcat}"
+        elif line.startswith('[LUMINAIRE]'):
+            line = re.sub(r'\d+(\.\d+)?W\b', f"{input_watts:g}W", line, count=1)
+        lines.append(line)
+    return lines
+
+
+def build_variant(base: Photometry, base_lumens_code: str, lumens_code: str, lumcat: str) -> Photometry:
+    """Scale the base distribution to the target lumens code at constant efficacy."""
+    if is_wildcard(base_lumens_code):
+        factor = int(lumens_code) * 10 / photometry_lumens(base)
+    else:
+        factor = int(lumens_code) / int(base_lumens_code)
+    params = list(base.photometric_params)
+    params[12] = round(base.input_watts * factor, 2)
+    return Photometry(_retitle(base.header_lines, lumcat, params[12]), base.tilt, params, base.vertical_angles,
+                      base.horizontal_angles, np.round(base.candela * factor, 1), list(base.tilt_lines))
+
+
+def _write_variant(job: Tuple[str, str, str, str, str]) -> Dict[str, Any]:
+    base_path, base_lumens_code, lumens_code, lumcat, output_path = job
+    with open(base_path, 'rb') as f:
+        base = parse_ies_arrays(decode_ies_bytes(f.read()))
+    variant = build_variant(base, base_lumens_code, lumens_code, lumcat)
+    with open(output_path, 'w') as f:
+        f.write(write_ies(variant))
+    lumens = photometry_lumens(variant)
+    watts = variant.input_watts
+    return {"Photometry LumCAT": lumcat, "IES File": os.path.basename(output_path), "Total Lumens": lumens,
+            "Input Watts": watts, "Efficacy (lm/W)": round(lumens / watts, 1) if watts > 0 else 0}
+
+
+# === ENUMERATION ===
+def plan_range(range_code: str, bases: List[Tuple[str, str]], allowed: Dict[str, List[str]],
+               lumens_codes: Optional[Sequence[str]], out_dir: str) -> Iterator[Tuple[Tuple[str, str, str, str, str], Dict[str, List[str]], str]]:
+    """Yield one photometry job per unique distribution, plus the per-field code choices that share it."""
+    seen = set()
+    for base_path, base_lumcat in bases:
+        _, base_codes, suffix = split_lumcat(base_lumcat)
+        # fixed photometric codes must be allowed by the filter; wildcard ones fan out over every allowed code
+        if any(not is_wildcard(base_codes[f]) and base_codes[f] not in allowed[f] for f in PHOTOMETRIC_FIELDS if f != 'Lumens Code'):
+            continue
+        targets = list(lumens_codes) if lumens_codes else [base_codes['Lumens Code']]
+        for lumens_code in targets:
+            if is_wildcard(lumens_code):
+                continue
+            photometry_codes = dict(base_codes, **{'Lumens Code': lumens_code})
+            photometry_lumcat = join_lumcat(range_code, photometry_codes, suffix)
+            if photometry_lumcat in seen:
+                continue
+            seen.add(photometry_lumcat)
+            choices = {f: allowed[f] if is_wildcard(c) else [c] for f, c in photometry_codes.items()}
+            output_path = os.path.join(out_dir, f"{photometry_lumcat}.ies")
+            yield (base_path, base_codes['Lumens Code'], lumens_code, photometry_lumcat, output_path), choices, suffix
+
+
+def iter_catalogue_codes(range_code: str, choices: Dict[str, List[str]], suffix: str) -> Iterator[str]:
+    fields = [field for field, _ in LUMCAT_LAYOUT]
+    for combo in itertools.product(*(choices[f] for f in fields)):
+        yield join_lumcat(range_code, dict(zip(fields, combo)), suffix)
+
+
+def generate_catalogue(range_code: str, base_dir: str, out_dir: str, registry: ConfigRegistry,
+                       filters: Optional[Dict[str, Sequence[str]]] = None, lumens_codes: Optional[Sequence[str]] = None,
+                       max_workers: Optional[int] = None) -> Dict[str, int]:
+    """Write one IES per unique photometry and stream every valid catalogue number into index.csv."""
+    os.makedirs(out_dir, exist_ok=True)
+    allowed = allowed_codes(registry, filters or {})
+    plan = list(plan_range(range_code, load_base_files(base_dir, range_code), allowed, lumens_codes, out_dir))
+    counts = {"ies_files": 0, "catalogue_numbers": 0}
+
+    with ProcessPoolExecutor(max_workers=max_workers) as pool, \
+            open(os.path.join(out_dir, 'index.csv'), 'w', newline='') as index_file:
+        writer = csv.DictWriter(index_file, fieldnames=INDEX_COLUMNS)
+        writer.writeheader()
+        results = pool.map(_write_variant, [job for job, _, _ in plan], chunksize=4)
+        for (_, choices, suffix), summary in zip(plan, results):
+            counts["ies_files"] += 1
+            for lumcat in iter_catalogue_codes(range_code, choices, suffix):
+                writer.writerow({"LumCAT": lumcat, **summary})
+                counts["catalogue_numbers"] += 1
+    return counts
+
+
+def _parse_filters(items: Sequence[str]) -> Dict[str, List[str]]:
+    filters = {}
+    for item in items:
+        field, _, codes = item.partition('=')
+        filters[field.strip()] = [c.strip() for c in codes.split(',') if c.strip()]
+    return filters
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Generate IES files and an index for every valid LumCAT combination in a range")
+    parser.add_argument("range", help="Range code, e.g. B852")
+    parser.add_argument("out", help="Output folder")
+    parser.add_argument("--base-dir", default='.', help="Folder of base IES files")
+    parser.add_argument("--dataset", default=DEFAULT_EXCEL_PATH, help="Linear_Data workbook")
+    parser.add_argument("--lumens", nargs='*', help="Lumens codes to generate (default: each base file's own)")
+    parser.add_argument("--only", nargs='*', default=[], help="Restrict fields, e.g. 'CRI Code=80,90' 'Driver Code=AA'")
+    parser.add_argument("-j", "--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    args = parser.parse_args(argv)
+
+    registry = get_registry(load_excel_dataset(args.dataset))
+    counts = generate_catalogue(args.range, args.base_dir, args.out, registry, _parse_filters(args.only), args.lumens, args.workers)
+    print(f"Wrote {counts['ies_files']} IES files covering {counts['catalogue_numbers']} catalogue numbers")
+
+
+if __name__ == "__main__":
+    main()
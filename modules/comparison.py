@@ -0,0 +1,97 @@
+import numpy as np
+import pandas as pd
+from typing import Dict, Optional
+
+from modules.ies_parser import Photometry, lumens_from_arrays
+
+BASE_LABEL = "LED Base"
+
+# +1: higher is better (green when it rises), -1: lower is better, 0: informational only
+METRIC_DIRECTIONS = {
+    "Total Lumens": 1,
+    "Efficacy (lm/W)": 1,
+    "Lumens per Meter": 1,
+    "Watts per Meter": -1,
+    "Input Watts": -1,
+    "Actual LED Current (mA)": -1,
+    "Peak Candela": 0,
+}
+
+
+def _safe_divide(numerator: np.ndarray, denominator: np.ndarray) -> np.ndarray:
+    out = np.zeros(np.broadcast(numerator, denominator).shape, dtype=np.float64)
+    np.divide(numerator, denominator, out=out, where=denominator > 0)
+    return out
+
+
+def stack_photometry(base: Photometry, variants: Dict[str, Photometry]) -> np.ndarray:
+    """Stack base + variant candela grids into one (M + 1, n_horz, n_vert) array."""
+    for name, variant in variants.items():
+        if variant.candela.shape != base.candela.shape \
+                or not np.array_equal(variant.vertical_angles, base.vertical_angles) \
+                or not np.array_equal(variant.horizontal_angles, base.horizontal_angles):
+            raise ValueError(f"Variant '{name}' does not share the base angle grid")
+    return np.stack([base.candela] + [v.candela for v in variants.values()])
+
+
+def compute_metrics(base: Photometry, variants: Dict[str, Photometry], vf_volts: Optional[float] = None) -> Dict[str, np.ndarray]:
+    candela = stack_photometry(base, variants)
+    photometries = [base] + list(variants.values())
+    input_watts = np.array([p.input_watts for p in photometries], dtype=np.float64)
+    length_m = np.array([p.length_m for p in photometries], dtype=np.float64)
+
+    lumens = lumens_from_arrays(base.vertical_angles, base.horizontal_angles, candela)
+    metrics = {
+        "Total Lumens": lumens,
+        "Efficacy (lm/W)": np.round(_safe_divide(lumens, input_watts), 1),
+        "Lumens per Meter": np.round(_safe_divide(lumens, length_m), 1),
+        "Watts per Meter": np.round(_safe_divide(input_watts, length_m), 2),
+        "Input Watts": input_watts,
+        "Peak Candela": np.round(candela.max(axis=(1, 2)), 1),
+    }
+    if vf_volts:
+        metrics["Actual LED Current (mA)"] = np.round(input_watts / vf_volts * 1000, 1)
+    return metrics
+
+
+def compare_variants(base: Photometry, variants: Dict[str, Photometry], vf_volts: Optional[float] = None) -> pd.DataFrame:
+    """Tidy Base vs Optimised table: one row per (Variant, Metric) with deltas and highlight direction."""
+    metrics = compute_metrics(base, variants, vf_volts)
+    names = list(variants.keys())
+    metric_names = list(metrics.keys())
+
+    # (n_metrics, M + 1): row 0 of each metric is the base
+    values = np.vstack([metrics[m] for m in metric_names])
+    base_values = values[:, :1]
+    variant_values = values[:, 1:]
+    delta = variant_values - base_values
+    delta_pct = np.round(_safe_divide(delta * 100, np.abs(base_values)), 1)
+
+    directions = np.array([METRIC_DIRECTIONS.get(m, 0) for m in metric_names])[:, None]
+    signed = np.sign(delta) * directions
+    highlight = np.where(signed > 0, "better", np.where(signed < 0, "worse", "same"))
+
+    n_metrics, n_variants = variant_values.shape
+    return pd.DataFrame({
+        "Variant": np.tile(names, n_metrics),
+        "Metric": np.repeat(metric_names, n_variants),
+        BASE_LABEL: np.repeat(base_values[:, 0], n_variants),
+        "Optimised": variant_values.ravel(),
+        "Delta": np.round(delta.ravel(), 2),
+        "Delta %": delta_pct.ravel(),
+        "Highlight": highlight.ravel(),
+    })
+
+
+def comparison_pivot(tidy: pd.DataFrame, value: str = "Optimised") -> pd.DataFrame:
+    """Wide view: metrics as rows, base plus one column per variant."""
+    wide = tidy.pivot(index="Metric", columns="Variant", values=value)
+    wide = wide.reindex(index=tidy["Metric"].unique(), columns=tidy["Variant"].unique())
+    base = tidy.drop_duplicates("Metric").set_index("Metric")[BASE_LABEL]
+    wide.insert(0, BASE_LABEL, base)
+    return wide
+
+
+def highlight_colours(tidy: pd.DataFrame) -> pd.Series:
+    colours = {"better": "background-color: #d4edda", "worse": "background-color: #f8d7da", "same": ""}
+    return tidy["Highlight"].map(colours)
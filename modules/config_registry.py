@@ -0,0 +1,236 @@
+import hashlib
+from dataclasses import dataclass, field
+from types import MappingProxyType
+from typing import Any, Dict, Mapping, Optional, Tuple
+
+import pandas as pd
+
+NOT_FOUND = "⚠️ Not Found"
+
+# Sheet -> columns that must exist for the registry to compile
+REQUIRED_COLUMNS = {
+    'LumCAT_Config': ('Option Code', 'Option Description', 'Diffuser / Louvre Code', 'Diffuser / Louvre Description',
+                      'Wiring Code', 'Wiring Description', 'Driver Code', 'Driver Description',
+                      'CRI Code', 'CRI Description', 'CCT/Colour Code', 'CCT/Colour Description'),
+    'Build_Data': ('Description',),
+    'LED_and_Board_Config': ('Default Tier', 'Chip Name', 'Max LED Load (mA)'),
+    'ECG_Config': ('Tier', 'ECG Model Name', 'Internal Code', 'Max Output (W)'),
+    'Customer_View_Config': ('Field',),
+}
+
+# Build_Data 'Description' rows read into TierConfig fields
+BUILD_DATA_ROWS = {
+    'chip_name': 'Chip_Name',
+    'max_led_load_ma': 'LED_Load_(mA)',
+    'led_pitch_mm': 'LED_Group_Pitch_(mm)',
+    'vf_volts': 'Vf_(Volts)',
+    'tm30_code': 'TM30-report_No.',
+}
+
+# parse_lumcat key -> (LumCAT_Config code column, description column, result label)
+LUMCAT_FIELDS = (
+    ('Option Code', 'Option Code', 'Option Description', 'Option Description'),
+    ('Diffuser Code', 'Diffuser / Louvre Code', 'Diffuser / Louvre Description', 'Diffuser Description'),
+    ('Wiring Code', 'Wiring Code', 'Wiring Description', 'Wiring Description'),
+    ('Driver Code', 'Driver Code', 'Driver Description', 'Driver Description'),
+    ('CRI Code', 'CRI Code', 'CRI Description', 'CRI Description'),
+    ('CCT Code', 'CCT/Colour Code', 'CCT/Colour Description', 'CCT Description'),
+)
+
+
+class ConfigError(ValueError):
+    pass
+
+
+@dataclass(frozen=True)
+class TierConfig:
+    tier: str
+    chip_name: Any
+    max_led_load_ma: float
+    led_pitch_mm: float
+    vf_volts: float
+    tm30_code: Any
+    extra: Mapping[str, Any] = field(default_factory=dict)
+
+
+@dataclass(frozen=True)
+class EcgConfig:
+    tier: Optional[str]
+    model_name: str
+    internal_code: str
+    max_output_w: float
+    default: bool
+    efficiency: Optional[float] = None
+
+
+@dataclass(frozen=True)
+class ConfigRegistry:
+    version: str
+    tiers: Mapping[str, TierConfig]
+    tooltips: Mapping[str, str]
+    lumcat_codes: Mapping[str, Mapping[str, str]]
+    ecgs: Tuple[EcgConfig, ...]
+    led_boards: Tuple[Mapping[str, Any], ...]
+
+    def tier(self, tier: str) -> TierConfig:
+        try:
+            return self.tiers[tier]
+        except KeyError:
+            raise KeyError(f"Tier '{tier}' is not defined in Build_Data") from None
+
+    def tooltip(self, field_name: str) -> str:
+        return self.tooltips.get(field_name.strip(), "")
+
+    def ecg_for_tier(self, tier: str) -> Optional[EcgConfig]:
+        return next((ecg for ecg in self.ecgs if ecg.tier == tier), None)
+
+    def default_ecg(self) -> Optional[EcgConfig]:
+        return next((ecg for ecg in self.ecgs if ecg.default), self.ecgs[0] if self.ecgs else None)
+
+    def describe_lumcat(self, parsed_codes: Optional[Dict[str, Any]]) -> Optional[Dict[str, str]]:
+        """Registry-backed equivalent of lumcat.lookup_lumcat_descriptions."""
+        if parsed_codes is None or not self.lumcat_codes:
+            return None
+        result = {'Range': parsed_codes['Range']}
+        for parsed_key, _, _, label in LUMCAT_FIELDS:
+            result[label] = self.lumcat_codes[parsed_key].get(str(parsed_codes[parsed_key]).strip(), NOT_FOUND)
+            if parsed_key == 'Driver Code':
+                result['Lumens (Display Only)'] = f"{parsed_codes['Lumens Derived Display']} lm"
+        return result
+
+
+# === COMPILATION ===
+def _clean(value: Any) -> Any:
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+
+def _code_key(value: Any) -> str:
+    return str(_clean(value)).strip()
+
+
+def validate_columns(dataset: Mapping[str, pd.DataFrame]) -> None:
+    problems = []
+    for sheet, df in dataset.items():
+        columns = {str(c).strip() for c in df.columns}
+        missing = [c for c in REQUIRED_COLUMNS.get(sheet, ()) if c not in columns]
+        if missing:
+            problems.append(f"{sheet}: missing {', '.join(missing)}")
+    if 'Build_Data' in dataset and 'Description' in dataset['Build_Data'].columns:
+        rows = set(dataset['Build_Data']['Description'].astype(str).str.strip())
+        missing_rows = [r for r in BUILD_DATA_ROWS.values() if r not in rows]
+        if missing_rows:
+            problems.append(f"Build_Data: missing rows {', '.join(missing_rows)}")
+    if problems:
+        raise ConfigError("Invalid dataset - " + "; ".join(problems))
+
+
+NUMERIC_TIER_FIELDS = ('max_led_load_ma', 'led_pitch_mm', 'vf_volts')
+
+
+def _numeric(value: Any, tier: str, row: str) -> float:
+    try:
+        number = float(pd.to_numeric(value))
+    except (TypeError, ValueError):
+        raise ConfigError(f"Build_Data: tier '{tier}' row '{row}' is not numeric ({value!r})") from None
+    if pd.isna(number):
+        raise ConfigError(f"Build_Data: tier '{tier}' row '{row}' is empty")
+    return number
+
+
+def _compile_tiers(build_data: pd.DataFrame) -> Dict[str, TierConfig]:
+    table = build_data.set_index(build_data['Description'].astype(str).str.strip()).drop(columns='Description')
+    field_rows = set(BUILD_DATA_ROWS.values())
+    tiers = {}
+    for tier in table.columns:
+        column = table[tier]
+        values = {name: _clean(column.get(row)) for name, row in BUILD_DATA_ROWS.items()}
+        # CSV sheets mix the chip name with numbers, so pandas hands these over as object/str
+        for name in NUMERIC_TIER_FIELDS:
+            values[name] = _numeric(values[name], str(tier).strip(), BUILD_DATA_ROWS[name])
+        extra = MappingProxyType({row: _clean(v) for row, v in column.items() if row not in field_rows})
+        tiers[str(tier).strip()] = TierConfig(tier=str(tier).strip(), extra=extra, **values)
+    return tiers
+
+
+def _compile_tooltips(view_config: pd.DataFrame) -> Dict[str, str]:
+    text_column = 'Tooltip' if 'Tooltip' in view_config.columns else 'Description'
+    if text_column not in view_config.columns:
+        return {}
+    rows = view_config[['Field', text_column]].dropna(subset=['Field'])
+    return {str(f).strip(): "" if pd.isna(t) else str(t) for f, t in zip(rows['Field'], rows[text_column])}
+
+
+def _compile_lumcat(lumcat_df: pd.DataFrame) -> Dict[str, Mapping[str, str]]:
+    codes = {}
+    for parsed_key, code_column, description_column, _ in LUMCAT_FIELDS:
+        pairs = lumcat_df[[code_column, description_column]].dropna(subset=[code_column])
+        mapping: Dict[str, str] = {}
+        for code, description in zip(pairs[code_column], pairs[description_column]):
+            # first match wins, as with .values[0] in lookup_lumcat_descriptions
+            mapping.setdefault(_code_key(code), description)
+        codes[parsed_key] = MappingProxyType(mapping)
+    return codes
+
+
+def _compile_ecgs(ecg_df: pd.DataFrame) -> Tuple[EcgConfig, ...]:
+    ecgs = []
+    for row in ecg_df.to_dict('records'):
+        tier = row.get('Tier')
+        efficiency = row.get('Efficiency (%)')
+        ecgs.append(EcgConfig(
+            tier=None if pd.isna(tier) else str(tier).strip(),
+            model_name=str(row['ECG Model Name']).strip(),
+            internal_code=str(row['Internal Code']).strip(),
+            max_output_w=float(row['Max Output (W)']),
+            default=str(row.get('Default', '')).strip().lower() == 'yes',
+            efficiency=None if efficiency is None or pd.isna(efficiency) else float(efficiency) / 100,
+        ))
+    return tuple(ecgs)
+
+
+def dataset_version(dataset: Mapping[str, pd.DataFrame]) -> str:
+    digest = hashlib.sha1()
+    for sheet in sorted(dataset):
+        df = dataset[sheet]
+        digest.update(f"{sheet}:{'|'.join(map(str, df.columns))}".encode())
+        digest.update(pd.util.hash_pandas_object(df, index=False).values.tobytes())
+    return digest.hexdigest()
+
+
+def build_registry(dataset: Mapping[str, pd.DataFrame], version: Optional[str] = None) -> ConfigRegistry:
+    dataset = {sheet: df.rename(columns=lambda c: str(c).strip()) for sheet, df in dataset.items()}
+    validate_columns(dataset)
+    return ConfigRegistry(
+        version=version or dataset_version(dataset),
+        tiers=MappingProxyType(_compile_tiers(dataset['Build_Data']) if 'Build_Data' in dataset else {}),
+        tooltips=MappingProxyType(_compile_tooltips(dataset['Customer_View_Config']) if 'Customer_View_Config' in dataset else {}),
+        lumcat_codes=MappingProxyType(_compile_lumcat(dataset['LumCAT_Config']) if 'LumCAT_Config' in dataset else {}),
+        ecgs=_compile_ecgs(dataset['ECG_Config']) if 'ECG_Config' in dataset else (),
+        led_boards=tuple(MappingProxyType(r) for r in dataset['LED_and_Board_Config'].to_dict('records'))
+        if 'LED_and_Board_Config' in dataset else (),
+    )
+
+
+_registry_cache: Dict[str, ConfigRegistry] = {}
+_last_source: Tuple[Any, str] = (None, "")
+
+
+def get_registry(dataset: Mapping[str, pd.DataFrame], source: Any = None) -> ConfigRegistry:
+    """Compile the dataset once per content version.
+
+    Without `source` every call hashes the frames. A caller that owns an immutable load object (e.g. the app's
+    background dataset load) can pass it as `source`; repeat calls with that same object skip the hash. The object
+    is held here so its identity cannot be reused.
+    """
+    global _last_source
+    if source is not None and _last_source[0] is source and _last_source[1] in _registry_cache:
+        return _registry_cache[_last_source[1]]
+
+    version = dataset_version(dataset)
+    if version not in _registry_cache:
+        _registry_cache.clear()
+        _registry_cache[version] = build_registry(dataset, version)
+    _last_source = (source, version)
+    return _registry_cache[version]
@@ -0,0 +1,10 @@
+import pandas as pd
+from typing import Dict, Union, IO
+
+DATASET_SHEETS = ('LumCAT_Config', 'Build_Data', 'LED_and_Board_Config', 'ECG_Config', 'Customer_View_Config')
+DEFAULT_EXCEL_PATH = 'Linear_Data.xlsx'
+
+
+def load_excel_dataset(source: Union[str, IO[bytes]] = DEFAULT_EXCEL_PATH) -> Dict[str, pd.DataFrame]:
+    workbook = pd.ExcelFile(source)
+    return {sheet: pd.read_excel(workbook, sheet) for sheet in DATASET_SHEETS if sheet in workbook.sheet_names}
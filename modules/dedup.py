@@ -0,0 +1,289 @@
+import hashlib
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from modules.ies_parser import Photometry, decode_ies_bytes, lumens_from_arrays, parse_ies_arrays
+
+QUANT_STEPS = 10_000  # normalised candela resolution for the exact hash: 0.01% of peak
+MATCH_TOLERANCE = 1e-3  # max normalised difference for grids that miss the hash only through rounding
+DENSE_RESIDUAL_FRACTION = 0.25  # above this share of differing values a residual is stored dense
+MAX_PRINTED_DECIMALS = 6
+
+
+@dataclass
+class Distribution:
+    vertical_angles: np.ndarray
+    horizontal_angles: np.ndarray
+    candela: np.ndarray  # representative (first seen) candela with its multiplier applied
+    peak: float
+    photometric_type: int
+
+    @property
+    def shape(self) -> np.ndarray:
+        return self.candela / self.peak if self.peak > 0 else self.candela
+
+
+@dataclass
+class Overlay:
+    """Everything per file that is not the shared distribution."""
+    distribution: str
+    scale: float  # peak candela after the file's multiplier
+    header_lines: List[str]
+    tilt: str
+    photometric_params: List[Any]
+    tilt_lines: List[str] = field(default_factory=list)
+    decimals: Optional[int] = None  # printed precision of the file's candela; reconstruction rounds to it
+    # exact correction on top of the scaled distribution: flat indices + values, or index None for a dense array
+    residual_index: Optional[np.ndarray] = None
+    residual_values: Optional[np.ndarray] = None
+
+
+def grid_key(photometric_type: int, vertical_angles: np.ndarray, horizontal_angles: np.ndarray) -> str:
+    digest = hashlib.sha1(f"{int(photometric_type)}:{len(vertical_angles)}x{len(horizontal_angles)}".encode())
+    digest.update(np.round(vertical_angles, 4).tobytes())
+    digest.update(np.round(horizontal_angles, 4).tobytes())
+    return digest.hexdigest()
+
+
+def _photometry_grid_key(photometry: Photometry) -> str:
+    return grid_key(photometry.photometric_params[5], photometry.vertical_angles, photometry.horizontal_angles)
+
+
+def normalise(photometry: Photometry) -> Tuple[str, float, np.ndarray]:
+    """(distribution hash, scale, shape): scale-equivalent grids on the same angles share a hash."""
+    candela = photometry.candela * photometry.photometric_params[2]
+    scale = float(candela.max())
+    shape = candela / scale if scale > 0 else candela
+    quantised = np.round(shape * QUANT_STEPS).astype(np.int32)
+
+    digest = hashlib.sha1(_photometry_grid_key(photometry).encode())
+    digest.update(quantised.tobytes())
+    return digest.hexdigest(), scale, shape
+
+
+def _parse_and_normalise(path: str) -> Tuple[str, Photometry, str, float, np.ndarray]:
+    with open(path, 'rb') as f:
+        photometry = parse_ies_arrays(decode_ies_bytes(f.read()))
+    return (path, photometry) + normalise(photometry)
+
+
+def printed_decimals(candela: np.ndarray) -> Optional[int]:
+    """Fewest decimals that reproduce every value (the precision the file was written at), or None."""
+    for decimals in range(MAX_PRINTED_DECIMALS + 1):
+        if np.array_equal(np.round(candela, decimals), candela):
+            return decimals
+    return None
+
+
+def _scaled(dist: Distribution, scale: float, multiplier: float, decimals: Optional[int]) -> np.ndarray:
+    factor = scale / dist.peak if dist.peak > 0 else 1.0
+    candela = dist.candela * factor / multiplier
+    return candela if decimals is None else np.round(candela, decimals)
+
+
+def _apply_residual(candela: np.ndarray, index: Optional[np.ndarray], values: Optional[np.ndarray]) -> np.ndarray:
+    if values is None:
+        return candela
+    if index is None:
+        return candela + values
+    candela = candela.copy()
+    candela.reshape(-1)[index] += values
+    return candela
+
+
+def _residual(approx: np.ndarray, candela: np.ndarray) -> Tuple[bool, Optional[np.ndarray], Optional[np.ndarray]]:
+    """(reconstructs exactly, index, values) for candela = approx + residual."""
+    diff = candela - approx
+    changed = np.flatnonzero(diff)
+    if changed.size == 0:
+        return True, None, None
+    if changed.size > DENSE_RESIDUAL_FRACTION * diff.size:
+        index, values = None, diff
+    else:
+        index, values = changed.astype(np.int32), diff.reshape(-1)[changed]
+    return np.array_equal(_apply_residual(approx, index, values), candela), index, values
+
+
+class _GridBucket:
+    """Normalised shapes on one angle grid in a growing stacked array, with per-shape means as a prefilter."""
+
+    def __init__(self, grid_shape: Tuple[int, int]):
+        self.keys: List[str] = []
+        self.shapes = np.empty((8,) + grid_shape)
+        self.means = np.empty(8)
+
+    def add(self, key: str, shape: np.ndarray) -> None:
+        n = len(self.keys)
+        if n == len(self.means):
+            self.shapes = np.concatenate([self.shapes, np.empty_like(self.shapes)])
+            self.means = np.concatenate([self.means, np.empty_like(self.means)])
+        self.shapes[n] = shape
+        self.means[n] = shape.mean()
+        self.keys.append(key)
+
+    def match(self, shape: np.ndarray) -> Optional[str]:
+        # |mean(a) - mean(b)| <= max|a - b|, so only shapes with a close mean need the full comparison
+        n = len(self.keys)
+        near = np.flatnonzero(np.abs(self.means[:n] - shape.mean()) <= MATCH_TOLERANCE)
+        if near.size == 0:
+            return None
+        diffs = np.abs(self.shapes[near] - shape).max(axis=(1, 2))
+        best = int(diffs.argmin())
+        return self.keys[near[best]] if diffs[best] <= MATCH_TOLERANCE else None
+
+
+class DedupIndex:
+    def __init__(self):
+        self.distributions: Dict[str, Distribution] = {}
+        self.entries: Dict[str, Overlay] = {}
+        self._buckets: Dict[str, _GridBucket] = {}
+
+    def _store_distribution(self, key: str, dist: Distribution) -> None:
+        self.distributions[key] = dist
+        grid = grid_key(dist.photometric_type, dist.vertical_angles, dist.horizontal_angles)
+        bucket = self._buckets.get(grid)
+        if bucket is None:
+            bucket = self._buckets[grid] = _GridBucket(dist.candela.shape)
+        bucket.add(key, dist.shape)
+
+    def _add_normalised(self, name: str, photometry: Photometry, key: str, scale: float, shape: np.ndarray) -> str:
+        multiplier = photometry.photometric_params[2]
+        decimals = printed_decimals(photometry.candela)
+        if key in self.distributions:
+            candidate = key
+        else:
+            bucket = self._buckets.get(_photometry_grid_key(photometry))
+            candidate = bucket.match(shape) if bucket else None
+
+        # a scale-equivalent file is rebuilt at its printed precision; only the odd value that rounds the other way
+        # is kept as a sparse residual, anything needing a dense one is a different distribution
+        exact, index, values = False, None, None
+        if candidate is not None:
+            exact, index, values = _residual(_scaled(self.distributions[candidate], scale, multiplier, decimals),
+                                             photometry.candela)
+        if exact and (values is None or index is not None):
+            key = candidate
+        else:
+            if key in self.distributions:
+                key = f"{key}-{len(self.distributions)}"
+            dist = Distribution(photometry.vertical_angles, photometry.horizontal_angles, photometry.candela * multiplier,
+                                scale, int(photometry.photometric_params[5]))
+            self._store_distribution(key, dist)
+            # (c * m) / m is within an ulp of c (and rounds back to c), so this residual is always exact
+            _, index, values = _residual(_scaled(dist, scale, multiplier, decimals), photometry.candela)
+
+        self.entries[name] = Overlay(key, scale, list(photometry.header_lines), photometry.tilt,
+                                     list(photometry.photometric_params), list(photometry.tilt_lines), decimals,
+                                     index, values)
+        return key
+
+    def add(self, name: str, photometry: Photometry) -> str:
+        return self._add_normalised(name, photometry, *normalise(photometry))
+
+    def add_files(self, paths: Sequence[str], max_workers: Optional[int] = None) -> None:
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            for path, photometry, key, scale, shape in pool.map(_parse_and_normalise, paths, chunksize=16):
+                self._add_normalised(path, photometry, key, scale, shape)
+
+    def photometry(self, name: str) -> Photometry:
+        entry = self.entries[name]
+        dist = self.distributions[entry.distribution]
+        candela = _apply_residual(_scaled(dist, entry.scale, entry.photometric_params[2], entry.decimals),
+                                  entry.residual_index, entry.residual_values)
+        return Photometry(list(entry.header_lines), entry.tilt, list(entry.photometric_params), dist.vertical_angles,
+                          dist.horizontal_angles, candela, list(entry.tilt_lines))
+
+    def groups(self) -> Dict[str, List[str]]:
+        groups: Dict[str, List[str]] = {key: [] for key in self.distributions}
+        for name, entry in self.entries.items():
+            groups[entry.distribution].append(name)
+        return groups
+
+    def stats(self) -> Dict[str, int]:
+        stored = sum(d.candela.size for d in self.distributions.values())
+        residual = sum(e.residual_values.size for e in self.entries.values() if e.residual_values is not None)
+        raw = sum(self.distributions[e.distribution].candela.size for e in self.entries.values())
+        return {"files": len(self.entries), "distributions": len(self.distributions),
+                "candela_values_stored": stored + residual, "residual_values": residual, "candela_values_raw": raw}
+
+    # === BATCH METRICS: ONCE PER UNIQUE DISTRIBUTION ===
+    def unique_lumens(self, symmetry_factor: int = 4) -> Dict[str, float]:
+        """Lumens per unit-peak distribution, stacked per angle grid so each grid integrates in one call."""
+        by_grid: Dict[Tuple[bytes, bytes], List[str]] = {}
+        for key, dist in self.distributions.items():
+            by_grid.setdefault((dist.vertical_angles.tobytes(), dist.horizontal_angles.tobytes()), []).append(key)
+
+        result = {}
+        for keys in by_grid.values():
+            first = self.distributions[keys[0]]
+            stacked = np.stack([self.distributions[k].shape for k in keys])
+            lumens = lumens_from_arrays(first.vertical_angles, first.horizontal_angles, stacked, symmetry_factor, decimals=None)
+            result.update(zip(keys, lumens.tolist()))
+        return result
+
+    def lumens(self, symmetry_factor: int = 4) -> Dict[str, float]:
+        """Per-file lumens from the shared integral (lumens are linear in candela) plus the integral of any sparse
+        residual. Matches photometry_lumens up to the file's printed rounding of candela."""
+        unique = self.unique_lumens(symmetry_factor)
+        result = {}
+        for name, e in self.entries.items():
+            lumens = unique[e.distribution] * e.scale / e.photometric_params[2]
+            if e.residual_values is not None:
+                dist = self.distributions[e.distribution]
+                residual = _apply_residual(np.zeros_like(dist.candela), e.residual_index, e.residual_values)
+                lumens += float(lumens_from_arrays(dist.vertical_angles, dist.horizontal_angles, residual, symmetry_factor,
+                                                   decimals=None))
+            result[name] = float(np.round(lumens, 1))
+        return result
+
+    # === PERSISTENCE ===
+    def save(self, path: str) -> None:
+        """Write <path>.npz (arrays per distribution and per residual) and <path>.json (per-file overlays)."""
+        arrays, entries = {}, {}
+        for key, dist in self.distributions.items():
+            arrays[f"{key}_v"], arrays[f"{key}_h"], arrays[f"{key}_cd"] = dist.vertical_angles, dist.horizontal_angles, dist.candela
+        for i, (name, e) in enumerate(self.entries.items()):
+            entry = asdict(e)
+            index, values = entry.pop("residual_index"), entry.pop("residual_values")
+            entry["residual"] = None
+            if values is not None:
+                entry["residual"] = i
+                arrays[f"r{i}_v"] = values
+                if index is not None:
+                    arrays[f"r{i}_i"] = index
+            entries[name] = entry
+        np.savez_compressed(f"{path}.npz", **arrays)
+        with open(f"{path}.json", 'w') as f:
+            json.dump({
+                "distributions": {k: {"photometric_type": d.photometric_type, "peak": d.peak} for k, d in self.distributions.items()},
+                "entries": entries,
+            }, f)
+
+    @classmethod
+    def load(cls, path: str) -> "DedupIndex":
+        index = cls()
+        with open(f"{path}.json") as f:
+            meta = json.load(f)
+        with np.load(f"{path}.npz") as arrays:
+            for key, d in meta["distributions"].items():
+                index._store_distribution(key, Distribution(arrays[f"{key}_v"], arrays[f"{key}_h"], arrays[f"{key}_cd"],
+                                                            d["peak"], d["photometric_type"]))
+            for name, e in meta["entries"].items():
+                residual = e.pop("residual")
+                if residual is not None:
+                    e["residual_values"] = arrays[f"r{residual}_v"]
+                    e["residual_index"] = arrays[f"r{residual}_i"] if f"r{residual}_i" in arrays else None
+                index.entries[name] = Overlay(**e)
+        return index
+
+
+def build_index(folder: str, max_workers: Optional[int] = None) -> DedupIndex:
+    paths = sorted(os.path.join(root, f) for root, _, files in os.walk(folder) for f in files if f.lower().endswith('.ies'))
+    index = DedupIndex()
+    index.add_files(paths, max_workers)
+    return index
@@ -0,0 +1,306 @@
+import argparse
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from modules.ies_parser import (
+    Photometry, corrected_simple_lumen_calculation, decode_ies_bytes, extract_meta_dict, parse_ies_arrays, write_ies
+)
+
+FEET_TO_MM = 304.8
+DIRECT_RATIO_COUNT = 10
+LUMEN_ROUND_TRIP_TOLERANCE = 0.005
+
+# IES last horizontal angle -> EULUMDAT Isym
+IES_SYMMETRY_TO_ISYM = {0.0: 1, 90.0: 4, 180.0: 2, 360.0: 0}
+
+
+# === C-PLANE SYMMETRY ===
+def stored_plane_indices(isym: int, mc: int) -> np.ndarray:
+    """Indices into the full C-angle list of the planes an LDT file actually stores for a given Isym."""
+    if isym == 1:
+        return np.array([0])
+    if isym == 2:
+        return np.arange(mc // 2 + 1)
+    if isym == 3:
+        return (3 * mc // 4 + np.arange(mc // 2 + 1)) % mc
+    if isym == 4:
+        return np.arange(mc // 4 + 1)
+    return np.arange(mc)
+
+
+def source_angles(c_angles: np.ndarray, isym: int) -> np.ndarray:
+    """Map every C-angle onto the measured plane it mirrors under the given symmetry."""
+    c = np.mod(c_angles, 360.0)
+    if isym == 1:
+        return np.zeros_like(c)
+    if isym == 2:
+        return np.where(c > 180.0, 360.0 - c, c)
+    if isym == 3:
+        return np.where((c > 90.0) & (c < 270.0), np.mod(180.0 - c, 360.0), c)
+    if isym == 4:
+        folded = np.mod(c, 180.0)
+        return np.where(folded > 90.0, 180.0 - folded, folded)
+    return c
+
+
+def expand_planes(stored_angles: np.ndarray, stored_candela: np.ndarray, target_angles: np.ndarray, isym: int) -> np.ndarray:
+    """Gather the (len(target_angles), n_gamma) intensity grid from the stored planes in one indexing step."""
+    order = np.argsort(stored_angles)
+    sorted_angles = stored_angles[order]
+    wanted = source_angles(target_angles, isym)
+    pos = np.clip(np.searchsorted(sorted_angles, wanted), 0, len(sorted_angles) - 1)
+    prev = np.clip(pos - 1, 0, len(sorted_angles) - 1)
+    pos = np.where(np.abs(sorted_angles[prev] - wanted) < np.abs(sorted_angles[pos] - wanted), prev, pos)
+    if not np.allclose(sorted_angles[pos], wanted, atol=1e-6):
+        raise ValueError("C-planes are not consistent with the declared symmetry")
+    return stored_candela[order[pos]]
+
+
+def full_c_angles(horizontal_angles: np.ndarray, isym: int) -> np.ndarray:
+    """All C-angles in [0, 360) implied by the stored IES planes and their symmetry."""
+    h = np.asarray(horizontal_angles, dtype=np.float64)
+    if isym == 1:
+        return np.array([0.0])
+    if isym == 4:
+        mirrored = np.concatenate([h, 180.0 - h, 180.0 + h, 360.0 - h])
+    elif isym == 2:
+        mirrored = np.concatenate([h, 360.0 - h])
+    else:
+        mirrored = h
+    return np.unique(np.round(np.mod(mirrored, 360.0), 6))
+
+
+def _spacing(angles: np.ndarray) -> float:
+    steps = np.diff(angles)
+    return float(steps[0]) if steps.size and np.allclose(steps, steps[0]) else 0.0
+
+
+def flux_from_grid(vertical_angles: np.ndarray, candela: np.ndarray, max_gamma: Optional[float] = None) -> float:
+    """Total flux over the sphere, treating the stored C-planes as equally weighted around 360°."""
+    vert_rad = np.radians(vertical_angles)
+    delta_vert = np.diff(vert_rad)
+    delta_vert = np.append(delta_vert, delta_vert[-1])
+    weights = np.sin(vert_rad) * delta_vert
+    if max_gamma is not None:
+        weights = np.where(np.asarray(vertical_angles) <= max_gamma, weights, 0.0)
+    return float(2 * np.pi * (candela @ weights).mean())
+
+
+# === READ ===
+def _number(line: str) -> float:
+    return float(line.strip().replace(',', '.') or 0)
+
+
+def parse_ldt_file(file_content: str) -> Tuple[Dict[str, Any], np.ndarray, np.ndarray, np.ndarray]:
+    """Return (header fields, full C-angles, gamma angles, stored intensities in cd/klm)."""
+    lines = [line.rstrip('\r') for line in file_content.splitlines()]
+    isym, mc, ng = int(_number(lines[2])), int(_number(lines[3])), int(_number(lines[5]))
+    n_sets = int(_number(lines[25]))
+    set_end = 26 + 6 * n_sets
+
+    lamp_sets = [{
+        "count": int(_number(lines[26 + i])),
+        "type": lines[26 + n_sets + i].strip(),
+        "flux": _number(lines[26 + 2 * n_sets + i]),
+        "cct": lines[26 + 3 * n_sets + i].strip(),
+        "cri": lines[26 + 4 * n_sets + i].strip(),
+        "watts": _number(lines[26 + 5 * n_sets + i]),
+    } for i in range(n_sets)]
+
+    header = {
+        "company": lines[0].strip(),
+        "ityp": int(_number(lines[1])),
+        "isym": isym,
+        "mc": mc,
+        "ng": ng,
+        "report": lines[7].strip(),
+        "luminaire_name": lines[8].strip(),
+        "luminaire_number": lines[9].strip(),
+        "file_name": lines[10].strip(),
+        "date_user": lines[11].strip(),
+        "dimensions_mm": [_number(x) for x in lines[12:21]],
+        "dff": _number(lines[21]),
+        "lorl": _number(lines[22]),
+        "conversion_factor": _number(lines[23]) or 1.0,
+        "tilt": _number(lines[24]),
+        "lamp_sets": lamp_sets,
+        "direct_ratios": [_number(x) for x in lines[set_end:set_end + DIRECT_RATIO_COUNT]],
+    }
+
+    values = np.array(" ".join(lines[set_end + DIRECT_RATIO_COUNT:]).replace(',', '.').split(), dtype=np.float64)
+    c_angles = values[:mc]
+    gamma_angles = values[mc:mc + ng]
+    n_stored = len(stored_plane_indices(isym, mc))
+    intensities = values[mc + ng:mc + ng + n_stored * ng]
+    if intensities.size != n_stored * ng:
+        raise ValueError(f"Expected {n_stored * ng} intensities, found {intensities.size}")
+    return header, c_angles, gamma_angles, intensities.reshape(n_stored, ng)
+
+
+def ldt_to_photometry(file_content: str) -> Photometry:
+    header, c_angles, gamma_angles, intensities = parse_ldt_file(file_content)
+    isym, mc = header["isym"], header["mc"]
+    stored_angles = c_angles[stored_plane_indices(isym, mc)]
+
+    lamp_flux = sum(s["flux"] for s in header["lamp_sets"])
+    candela = intensities * header["conversion_factor"] * lamp_flux / 1000.0
+
+    if isym in (1, 2, 4):
+        horizontal_angles = stored_angles
+    else:
+        # no LM-63 equivalent for C90-C270 symmetry (and Isym 0 needs the closing 360° plane), so expand to full
+        candela = expand_planes(stored_angles, candela, c_angles, isym)
+        horizontal_angles = np.append(c_angles, 360.0)
+        candela = np.vstack([candela, candela[:1]])
+
+    length_mm, width_mm, height_mm = header["dimensions_mm"][:3]
+    params = [1, -1, 1, len(gamma_angles), len(horizontal_angles), 1, 2,
+              round(width_mm / 1000, 4), round(length_mm / 1000, 4), round(height_mm / 1000, 4),
+              1, 1, round(sum(s["watts"] for s in header["lamp_sets"]), 2)]
+    header_lines = [
+        "IESNA:LM-63-2002",
+        f"[TEST] {header['report']}",
+        f"[MANUFAC] {header['company']}",
+        f"[LUMCAT] {header['luminaire_number']}",
+        f"[LUMINAIRE] {header['luminaire_name']}",
+        f"[ISSUEDATE] {header['date_user']}",
+        f"[MORE] Converted from EULUMDAT {header['file_name']}".rstrip(),
+    ]
+    return Photometry(header_lines, "NONE", params, gamma_angles, horizontal_angles, np.round(candela, 4))
+
+
+# === WRITE ===
+def _fmt(value: float) -> str:
+    return format(float(value), '.10g')
+
+
+def photometry_to_ldt(photometry: Photometry, file_name: str = "") -> str:
+    meta = extract_meta_dict(photometry.header_lines)
+    params = photometry.photometric_params
+    h = photometry.horizontal_angles
+    isym = IES_SYMMETRY_TO_ISYM.get(float(h[-1]) - float(h[0]))
+    if isym is None or h[0] != 0.0:
+        raise ValueError(f"Horizontal angles {h[0]}..{h[-1]} do not map onto a EULUMDAT symmetry")
+
+    candela = photometry.candela * params[2]
+    if isym == 0:
+        candela = candela[:-1]
+
+    total_flux = flux_from_grid(photometry.vertical_angles, candela)
+    absolute = params[1] == -1
+    lamp_flux = total_flux if absolute else params[0] * params[1]
+    if lamp_flux <= 0:
+        raise ValueError(f"Lamp flux must be positive to scale intensities to cd/klm, got {lamp_flux}")
+    lorl = 100.0 if absolute else total_flux / lamp_flux * 100
+    dff = flux_from_grid(photometry.vertical_angles, candela, max_gamma=90.0) / total_flux * 100 if total_flux else 0.0
+    intensities = candela * 1000.0 / lamp_flux
+
+    c_angles = full_c_angles(h, isym)
+    mc = len(c_angles)
+    if len(stored_plane_indices(isym, mc)) != candela.shape[0]:
+        raise ValueError("Horizontal angles are not evenly mirrored for the detected symmetry")
+
+    to_mm = FEET_TO_MM if params[6] == 1 else 1000.0
+    width_mm, length_mm, height_mm = (params[7] * to_mm, params[8] * to_mm, params[9] * to_mm)
+    luminaire_name = meta.get("[LUMINAIRE]", "")
+
+    lines = [
+        meta.get("[MANUFAC]", ""),
+        "1" if isym == 1 else "3",
+        str(isym),
+        str(mc),
+        _fmt(_spacing(c_angles)),
+        str(len(photometry.vertical_angles)),
+        _fmt(_spacing(photometry.vertical_angles)),
+        meta.get("[TEST]", ""),
+        luminaire_name,
+        meta.get("[LUMCAT]", ""),
+        file_name,
+        meta.get("[ISSUEDATE]", date.today().isoformat()),
+        _fmt(length_mm), _fmt(width_mm), _fmt(height_mm),
+        _fmt(length_mm), _fmt(width_mm), "0", "0", "0", "0",
+        _fmt(round(dff, 1)),
+        _fmt(round(lorl, 1)),
+        "1",
+        "0",
+        "1",
+        str(params[0]),
+        "LED",
+        _fmt(lamp_flux),
+        "",
+        "",
+        _fmt(params[12]),
+    ]
+    lines.extend(["0"] * DIRECT_RATIO_COUNT)
+    lines.extend(_fmt(x) for x in c_angles)
+    lines.extend(_fmt(x) for x in photometry.vertical_angles)
+    lines.extend(_fmt(x) for x in np.round(intensities, 4).ravel())
+    return "\r\n".join(lines) + "\r\n"
+
+
+# === ROUND TRIP / BULK CONVERSION ===
+def round_trip_lumens(photometry: Photometry) -> Tuple[float, float]:
+    """Lumens (corrected_simple_lumen_calculation) before and after IES -> LDT -> IES."""
+    returned = ldt_to_photometry(photometry_to_ldt(photometry))
+    before = corrected_simple_lumen_calculation(photometry.vertical_angles, photometry.horizontal_angles,
+                                                photometry.candela * photometry.photometric_params[2])
+    after = corrected_simple_lumen_calculation(returned.vertical_angles, returned.horizontal_angles, returned.candela)
+    return before, after
+
+
+def convert_file(src_path: str, dst_dir: str, check_lumens: bool = True) -> Dict[str, Any]:
+    stem, ext = os.path.splitext(os.path.basename(src_path))
+    result: Dict[str, Any] = {"source": src_path, "output": None, "error": None}
+    try:
+        with open(src_path, 'rb') as f:
+            content = decode_ies_bytes(f.read())
+        if ext.lower() == '.ies':
+            photometry = parse_ies_arrays(content)
+            output_path = os.path.join(dst_dir, f"{stem}.ldt")
+            output = photometry_to_ldt(photometry, os.path.basename(output_path))
+            if check_lumens:
+                before, after = round_trip_lumens(photometry)
+                result["lumens"], result["round_trip_lumens"] = before, after
+                result["lumens_ok"] = abs(after - before) <= LUMEN_ROUND_TRIP_TOLERANCE * max(abs(before), 1.0)
+        else:
+            output_path = os.path.join(dst_dir, f"{stem}.ies")
+            output = write_ies(ldt_to_photometry(content))
+        with open(output_path, 'w', newline='') as f:
+            f.write(output)
+        result["output"] = output_path
+    except Exception as e:  # one bad file must not abort a bulk conversion running in the pool
+        result["error"] = str(e) or type(e).__name__
+    return result
+
+
+def convert_folder(src_dir: str, dst_dir: str, to_format: str = 'ldt', max_workers: Optional[int] = None) -> List[Dict[str, Any]]:
+    """Convert every .ies (to_format='ldt') or .ldt (to_format='ies') file in a folder across worker processes."""
+    source_ext = '.ies' if to_format == 'ldt' else '.ldt'
+    sources = sorted(os.path.join(src_dir, f) for f in os.listdir(src_dir) if f.lower().endswith(source_ext))
+    os.makedirs(dst_dir, exist_ok=True)
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        return list(pool.map(convert_file, sources, [dst_dir] * len(sources), chunksize=8))
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Bulk convert between IES (LM-63) and EULUMDAT (LDT)")
+    parser.add_argument("src", help="Folder of source files")
+    parser.add_argument("dst", help="Output folder")
+    parser.add_argument("--to", choices=("ldt", "ies"), default="ldt", help="Target format")
+    parser.add_argument("-j", "--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    args = parser.parse_args(argv)
+
+    results = convert_folder(args.src, args.dst, args.to, args.workers)
+    failures = [r for r in results if r["error"] or r.get("lumens_ok") is False]
+    for r in failures:
+        print(f"{r['source']}: {r['error'] or 'round-trip lumens %s -> %s' % (r['lumens'], r['round_trip_lumens'])}")
+    print(f"Converted {len(results) - len(failures)}/{len(results)} files")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,28 +1,49 @@
-import streamlit as st
-import pandas as pd
+from typing import TYPE_CHECKING, Dict
+
+if TYPE_CHECKING:
+    import pandas as pd
 
 GOOGLE_SHEET_ID = '19r5hWEnQtBIGphGhpQhsXgPVWT2TJ1jWYjbDphNzFMs'
+GOOGLE_SHEETS = ('LumCAT_Config', 'Build_Data', 'Customer_View_Config')
+FETCH_TIMEOUT_S = 20
+
+# streamlit, pandas and the registry are imported inside the functions so importing this module stays cheap on cold start
+
+
+def fetch_google_sheet_data() -> Dict[str, "pd.DataFrame"]:
+    """Download the dataset sheets; safe to call from a background thread (no Streamlit calls)."""
+    import pandas as pd
+    from concurrent.futures import ThreadPoolExecutor
+    from urllib.request import urlopen
+
+    def read_sheet(url: str) -> "pd.DataFrame":
+        # pd.read_csv(url) has no timeout, so a stalled connection would hang the load for good
+        with urlopen(url, timeout=FETCH_TIMEOUT_S) as response:
+            return pd.read_csv(response)
+
+    urls = [f'https://docs.google.com/spreadsheets/d/{GOOGLE_SHEET_ID}/gviz/tq?tqx=out:csv&sheet={sheet}' for sheet in GOOGLE_SHEETS]
+    with ThreadPoolExecutor(max_workers=len(urls)) as pool:
+        return dict(zip(GOOGLE_SHEETS, pool.map(read_sheet, urls)))
 
 def load_google_sheet_data() -> None:
+    import streamlit as st
+
     try:
-        lumcat_url = f'https://docs.google.com/spreadsheets/d/{GOOGLE_SHEET_ID}/gviz/tq?tqx=out:csv&sheet=LumCAT_Config'
-        build_data_url = f'https://docs.google.com/spreadsheets/d/{GOOGLE_SHEET_ID}/gviz/tq?tqx=out:csv&sheet=Build_Data'
-        view_config_url = f'https://docs.google.com/spreadsheets/d/{GOOGLE_SHEET_ID}/gviz/tq?tqx=out:csv&sheet=Customer_View_Config'
-
-        st.session_state['dataset'] = {
-            'LumCAT_Config': pd.read_csv(lumcat_url),
-            'Build_Data': pd.read_csv(build_data_url),
-            'Customer_View_Config': pd.read_csv(view_config_url)
-        }
+        st.session_state['dataset'] = fetch_google_sheet_data()
         st.success("✅ Successfully loaded Google Sheets data")
     except Exception as e:
         st.error(f"❌ Failed to load dataset: {e}")
 
 def get_tooltip(field: str) -> str:
-    tooltips_df = st.session_state['dataset'].get('Customer_View_Config')
-    if tooltips_df is not None:
-        if 'Field' in tooltips_df.columns and 'Tooltip' in tooltips_df.columns:
-            match = tooltips_df[tooltips_df['Field'].str.strip() == field.strip()]
-            if not match.empty:
-                return match['Tooltip'].values[0]
-    return ""
+    import streamlit as st
+
+    dataset = st.session_state.get('dataset')
+    if not dataset:
+        return ""
+    # the compiled registry is kept next to the dataset it came from, so a lookup is one identity check and a dict get
+    cached = st.session_state.get('registry')
+    if cached is None or cached[0] is not dataset:
+        from modules.config_registry import get_registry
+
+        cached = st.session_state['registry'] = (dataset, get_registry(dataset, source=dataset))
+    return cached[1].tooltip(field)
@@ -1,5 +1,7 @@
+import hashlib
 import numpy as np
-from typing import List, Tuple
+from dataclasses import dataclass, field
+from typing import List, Optional, Tuple, Union
 
 def parse_ies_file(file_content: str) -> Tuple[List[str], List[float], List[float], List[float], List[List[float]]]:
     lines = file_content.splitlines()
@@ -63,3 +65,167 @@ def extract_meta_dict(header_lines: List[str]) -> dict:
             value = line.split(']')[-1].strip()
             meta_dict[key] = value
     return meta_dict
+
+
+# === ARRAY-BACKED PHOTOMETRY ===
+PHOTOMETRIC_PARAM_COUNT = 13
+
+
+@dataclass
+class Photometry:
+    header_lines: List[str]
+    tilt: str
+    photometric_params: List[Union[int, float]]
+    vertical_angles: np.ndarray
+    horizontal_angles: np.ndarray
+    candela: np.ndarray  # shape (n_horz, n_vert), one row per horizontal angle
+    tilt_lines: List[str] = field(default_factory=list)
+
+    @property
+    def n_vert(self) -> int:
+        return int(self.photometric_params[3])
+
+    @property
+    def n_horz(self) -> int:
+        return int(self.photometric_params[4])
+
+    @property
+    def input_watts(self) -> float:
+        return float(self.photometric_params[12])
+
+    @property
+    def length_m(self) -> float:
+        return float(self.photometric_params[8])
+
+    def to_legacy(self) -> Tuple[List[str], List[float], List[float], List[float], List[List[float]]]:
+        return (self.header_lines, self.photometric_params, self.vertical_angles.tolist(),
+                self.horizontal_angles.tolist(), self.candela.tolist())
+
+
+def photometry_hash(photometry: Photometry) -> str:
+    """Content hash of the photometric data (params, angles, candela); header text is ignored."""
+    digest = hashlib.sha1(repr(photometry.photometric_params).encode())
+    for array in (photometry.vertical_angles, photometry.horizontal_angles, photometry.candela):
+        digest.update(np.ascontiguousarray(array, dtype=np.float64).tobytes())
+    return digest.hexdigest()
+
+
+def decode_ies_bytes(raw: bytes) -> str:
+    try:
+        return raw.decode('utf-8')
+    except UnicodeDecodeError:
+        return raw.decode('latin-1')
+
+
+def parse_param_token(token: str) -> Union[int, float]:
+    return float(token) if '.' in token or 'e' in token.lower() else int(token)
+
+
+def split_ies_sections(file_content: str) -> Tuple[List[str], str, List[str], List[str], np.ndarray]:
+    """Split an LM-63 file into header, TILT value, TILT block, parameter tokens and the numeric tail."""
+    lines = file_content.splitlines()
+    tilt_idx = next((i for i, line in enumerate(lines) if line.strip().startswith("TILT")), None)
+    if tilt_idx is None:
+        raise ValueError("No TILT line found")
+
+    header_lines = [line.strip() for line in lines[:tilt_idx]]
+    tilt = lines[tilt_idx].strip().split('=', 1)[-1].strip()
+    tokens = " ".join(lines[tilt_idx + 1:]).split()
+
+    # TILT=INCLUDE carries geometry, angle count, angles and multipliers before the photometric params
+    tilt_lines: List[str] = []
+    if tilt.upper() == "INCLUDE":
+        if len(tokens) < 2:
+            raise ValueError("Truncated TILT=INCLUDE block")
+        n_tilt = int(tokens[1])
+        tilt_len = 2 + 2 * n_tilt
+        tilt_lines = [tokens[0], tokens[1], " ".join(tokens[2:2 + n_tilt]), " ".join(tokens[2 + n_tilt:tilt_len])]
+        tokens = tokens[tilt_len:]
+
+    param_tokens = tokens[:PHOTOMETRIC_PARAM_COUNT]
+    values = np.array(tokens[PHOTOMETRIC_PARAM_COUNT:], dtype=np.float64)
+    return header_lines, tilt, tilt_lines, param_tokens, values
+
+
+def parse_ies_arrays(file_content: str) -> Photometry:
+    header_lines, tilt, tilt_lines, param_tokens, values = split_ies_sections(file_content)
+    if len(param_tokens) < PHOTOMETRIC_PARAM_COUNT:
+        raise ValueError(f"Expected {PHOTOMETRIC_PARAM_COUNT} photometric parameters, found {len(param_tokens)}")
+    photometric_params = [parse_param_token(x) for x in param_tokens]
+
+    n_vert = int(photometric_params[3])
+    n_horz = int(photometric_params[4])
+    if n_vert < 1 or n_horz < 1:
+        raise ValueError(f"Angle counts must be positive, got {n_vert} vertical x {n_horz} horizontal")
+    expected = n_vert + n_horz + n_vert * n_horz
+    if values.size < expected:
+        raise ValueError(f"Expected {expected} angle/candela values, found {values.size}")
+
+    vertical_angles = values[:n_vert]
+    horizontal_angles = values[n_vert:n_vert + n_horz]
+    candela = values[n_vert + n_horz:expected].reshape(n_horz, n_vert)
+
+    return Photometry(header_lines, tilt, photometric_params, vertical_angles, horizontal_angles, candela, tilt_lines)
+
+
+def lumens_from_arrays(vertical_angles: np.ndarray, horizontal_angles: np.ndarray, candela: np.ndarray, symmetry_factor: int = 4,
+                       decimals: Optional[int] = 1) -> np.ndarray:
+    """Vectorised corrected_simple_lumen_calculation; candela may be stacked as (..., n_horz, n_vert)."""
+    vert_rad = np.radians(np.asarray(vertical_angles, dtype=np.float64))
+    delta_vert = np.diff(vert_rad)
+    delta_vert = np.append(delta_vert, delta_vert[-1])
+
+    horizontal_angles = np.asarray(horizontal_angles, dtype=np.float64)
+    uniform_delta_horz = np.radians(horizontal_angles[-1] - horizontal_angles[0]) / len(horizontal_angles)
+
+    weights = np.sin(vert_rad) * delta_vert * uniform_delta_horz
+    total_flux = (np.asarray(candela, dtype=np.float64) @ weights).sum(axis=-1)
+    total_flux = total_flux * symmetry_factor
+    return total_flux if decimals is None else np.round(total_flux, decimals)
+
+
+# Type C horizontal end angle -> planes of symmetry the quadrant formula (factor 4) needs scaling for
+HORZ_SYMMETRY_FACTORS = {90.0: 4, 180.0: 2, 360.0: 1}
+
+
+def symmetry_factor_for(photometry: Photometry) -> Optional[int]:
+    """Symmetry factor for lumens_from_arrays, or None where its formula does not apply (type A/B, single plane)."""
+    horz = photometry.horizontal_angles
+    if photometry.photometric_params[5] != 1 or horz.size < 2 or horz[0] != 0.0:
+        return None
+    return HORZ_SYMMETRY_FACTORS.get(float(horz[-1]))
+
+
+def photometry_lumens(photometry: Photometry, symmetry_factor: int = 4) -> float:
+    return float(lumens_from_arrays(photometry.vertical_angles, photometry.horizontal_angles, photometry.candela, symmetry_factor))
+
+
+def scale_to_length(photometry: Photometry, length_m: float) -> Photometry:
+    """Linear scaling: candela and input watts follow length so lm/m and W/m stay constant."""
+    if photometry.length_m <= 0:
+        raise ValueError("Base photometry has no length to scale from")
+    factor = length_m / photometry.length_m
+    params = list(photometry.photometric_params)
+    params[8] = round(length_m, 4)
+    params[12] = round(photometry.input_watts * factor, 2)
+    return Photometry(list(photometry.header_lines), photometry.tilt, params, photometry.vertical_angles,
+                      photometry.horizontal_angles, np.round(photometry.candela * factor, 1), list(photometry.tilt_lines))
+
+
+def _format_values(values: np.ndarray, per_line: int = 10) -> List[str]:
+    flat = [repr(float(x)) for x in np.asarray(values).ravel()]
+    return [" ".join(flat[i:i + per_line]) for i in range(0, len(flat), per_line)]
+
+
+def write_ies(photometry: Photometry) -> str:
+    params = [str(x) for x in photometry.photometric_params]
+    lines = list(photometry.header_lines)
+    lines.append(f"TILT={photometry.tilt}")
+    lines.extend(photometry.tilt_lines)
+    lines.append(" ".join(params[:10]))
+    lines.append(" ".join(params[10:]))
+    lines.extend(_format_values(photometry.vertical_angles))
+    lines.extend(_format_values(photometry.horizontal_angles))
+    for row in photometry.candela:
+        lines.extend(_format_values(row))
+    return "\n".join(lines) + "\n"
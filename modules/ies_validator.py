@@ -0,0 +1,255 @@
+import argparse
+import json
+import os
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from modules.ies_parser import (
+    PHOTOMETRIC_PARAM_COUNT, Photometry, decode_ies_bytes, lumens_from_arrays, split_ies_sections, parse_param_token,
+    symmetry_factor_for
+)
+
+SUPPORTED_FORMATS = ("IESNA:LM-63-2002", "IESNA:LM-63-1995", "IESNA91")
+VALID_PHOTOMETRIC_TYPES = (1, 2, 3)
+VALID_UNITS_TYPES = (1, 2)
+VALID_HORZ_END_ANGLES = (0.0, 90.0, 180.0, 360.0)
+LUMEN_TOLERANCE = 0.05
+
+
+def _issue(code: str, severity: str, message: str) -> Dict[str, str]:
+    return {"code": code, "severity": severity, "message": message}
+
+
+# === STRUCTURAL CHECKS ===
+def check_header(header_lines: List[str], tilt: str) -> List[Dict[str, str]]:
+    issues = []
+    first = header_lines[0] if header_lines else ""
+    if first not in SUPPORTED_FORMATS:
+        issues.append(_issue("HEADER_FORMAT", "error" if not first.startswith("IESNA") else "warning",
+                             f"First line '{first}' is not a recognised LM-63 format identifier"))
+    elif first != "IESNA:LM-63-2002":
+        issues.append(_issue("HEADER_FORMAT", "warning", f"File is {first}, not LM-63-2002"))
+
+    keywords = {line.split(']')[0] + "]" for line in header_lines if line.startswith('[') and ']' in line}
+    for required in ("[TEST]", "[MANUFAC]"):
+        if required not in keywords:
+            issues.append(_issue("HEADER_KEYWORD", "warning", f"Required keyword {required} is missing"))
+
+    if tilt.upper() not in ("NONE", "INCLUDE"):
+        issues.append(_issue("TILT_FILE", "warning", f"TILT references external file '{tilt}' which is not validated"))
+    return issues
+
+
+def check_tilt_block(tilt_lines: List[str]) -> List[Dict[str, str]]:
+    if not tilt_lines:
+        return []
+    issues = []
+    if tilt_lines[0] not in ("1", "2", "3"):
+        issues.append(_issue("TILT_GEOMETRY", "error", f"Lamp-to-luminaire geometry {tilt_lines[0]} must be 1, 2 or 3"))
+    angles = np.array(tilt_lines[2].split(), dtype=np.float64)
+    multipliers = np.array(tilt_lines[3].split(), dtype=np.float64)
+    if angles.size != int(tilt_lines[1]) or multipliers.size != int(tilt_lines[1]):
+        issues.append(_issue("TILT_COUNT", "error", "TILT angle/multiplier counts do not match the declared count"))
+    elif angles.size > 1 and not np.all(np.diff(angles) > 0):
+        issues.append(_issue("TILT_ANGLES", "error", "TILT angles are not strictly increasing"))
+    return issues
+
+
+def check_params(param_tokens: List[str], n_values: int) -> Tuple[List[Dict[str, str]], Optional[List[Any]]]:
+    if len(param_tokens) < PHOTOMETRIC_PARAM_COUNT:
+        return [_issue("PARAM_COUNT", "error", f"Expected {PHOTOMETRIC_PARAM_COUNT} photometric parameters, found {len(param_tokens)}")], None
+    try:
+        params = [parse_param_token(x) for x in param_tokens]
+    except ValueError as e:
+        return [_issue("PARAM_VALUE", "error", f"Non-numeric photometric parameter: {e}")], None
+
+    issues = []
+    if params[0] < 1:
+        issues.append(_issue("LAMP_COUNT", "error", f"Number of lamps {params[0]} must be >= 1"))
+    if params[1] != -1 and params[1] <= 0:
+        issues.append(_issue("LUMENS_PER_LAMP", "error", f"Lumens per lamp {params[1]} must be positive or -1 (absolute photometry)"))
+    if params[2] <= 0:
+        issues.append(_issue("MULTIPLIER", "error", f"Candela multiplier {params[2]} must be positive"))
+    elif params[2] != 1:
+        issues.append(_issue("MULTIPLIER", "warning", f"Candela multiplier is {params[2]}, not 1"))
+    for idx, name in ((3, "vertical"), (4, "horizontal")):
+        if not isinstance(params[idx], int) or params[idx] < 1:
+            issues.append(_issue("ANGLE_COUNT", "error", f"Number of {name} angles {params[idx]} must be a positive integer"))
+    if params[5] not in VALID_PHOTOMETRIC_TYPES:
+        issues.append(_issue("PHOTOMETRIC_TYPE", "error", f"Photometric type {params[5]} must be 1 (C), 2 (B) or 3 (A)"))
+    if params[6] not in VALID_UNITS_TYPES:
+        issues.append(_issue("UNITS_TYPE", "error", f"Units type {params[6]} must be 1 (feet) or 2 (metres)"))
+    if params[10] <= 0:
+        issues.append(_issue("BALLAST_FACTOR", "error", f"Ballast factor {params[10]} must be positive"))
+    if params[12] <= 0:
+        issues.append(_issue("INPUT_WATTS", "error", f"Input watts {params[12]} must be positive"))
+    if any(i["code"] == "ANGLE_COUNT" for i in issues):
+        return issues, None
+
+    expected = params[3] + params[4] + params[3] * params[4]
+    if n_values != expected:
+        issues.append(_issue("ROW_COUNT", "error",
+                             f"Expected {expected} angle/candela values for {params[3]} x {params[4]} grid, found {n_values}"))
+        return issues, None
+    return issues, params
+
+
+# === NUMERIC CHECKS (VECTORISED OVER THE CANDELA GRID) ===
+def check_angles(photometry: Photometry) -> List[Dict[str, str]]:
+    issues = []
+    vert, horz = photometry.vertical_angles, photometry.horizontal_angles
+    photometric_type = photometry.photometric_params[5]
+
+    if vert.size > 1 and not np.all(np.diff(vert) > 0):
+        issues.append(_issue("VERT_MONOTONIC", "error", "Vertical angles are not strictly increasing"))
+    if horz.size > 1 and not np.all(np.diff(horz) > 0):
+        issues.append(_issue("HORZ_MONOTONIC", "error", "Horizontal angles are not strictly increasing"))
+
+    if photometric_type == 1:
+        if vert[0] not in (0.0, 90.0) or vert[-1] not in (90.0, 180.0):
+            issues.append(_issue("VERT_RANGE", "error", f"Type C vertical angles must span 0/90 to 90/180, got {vert[0]} to {vert[-1]}"))
+        if horz[0] != 0.0 or horz[-1] not in VALID_HORZ_END_ANGLES:
+            issues.append(_issue("HORZ_RANGE", "error", f"Type C horizontal angles must start at 0 and end at 0/90/180/360, got {horz[0]} to {horz[-1]}"))
+    elif photometric_type in (2, 3):
+        if vert[0] not in (-90.0, 0.0) or vert[-1] != 90.0:
+            issues.append(_issue("VERT_RANGE", "error", f"Type A/B vertical angles must span -90/0 to 90, got {vert[0]} to {vert[-1]}"))
+        if horz[0] not in (-90.0, 0.0) or horz[-1] != 90.0:
+            issues.append(_issue("HORZ_RANGE", "error", f"Type A/B horizontal angles must span -90/0 to 90, got {horz[0]} to {horz[-1]}"))
+    return issues
+
+
+def check_candela(photometry: Photometry) -> List[Dict[str, str]]:
+    issues = []
+    candela = photometry.candela
+    non_finite = int(np.count_nonzero(~np.isfinite(candela)))
+    negative = int(np.count_nonzero(candela < 0))
+    if non_finite:
+        issues.append(_issue("CANDELA_FINITE", "error", f"{non_finite} candela values are not finite"))
+    if negative:
+        issues.append(_issue("CANDELA_NEGATIVE", "error", f"{negative} candela values are negative"))
+    if not np.any(candela > 0):
+        issues.append(_issue("CANDELA_ZERO", "error", "Candela grid contains no positive values"))
+    return issues
+
+
+def check_lumens(photometry: Photometry, calculated_lumens: float) -> List[Dict[str, str]]:
+    lamps, lumens_per_lamp = photometry.photometric_params[0], photometry.photometric_params[1]
+    if lumens_per_lamp == -1 or calculated_lumens <= 0:
+        return []
+    rated = lamps * lumens_per_lamp
+    if abs(calculated_lumens - rated) / rated > LUMEN_TOLERANCE:
+        return [_issue("LUMENS_MISMATCH", "warning",
+                       f"Integrated lumens {calculated_lumens} differ from rated {rated} by more than {LUMEN_TOLERANCE:.0%}")]
+    return []
+
+
+# === FILE / BATCH VALIDATION ===
+def validate_ies_content(name: str, file_content: str) -> Dict[str, Any]:
+    result: Dict[str, Any] = {"file": name, "valid": False, "issues": [], "summary": {}}
+    try:
+        header_lines, tilt, tilt_lines, param_tokens, values = split_ies_sections(file_content)
+        issues = check_header(header_lines, tilt) + check_tilt_block(tilt_lines)
+    except ValueError as e:
+        result["issues"].append(_issue("STRUCTURE", "error", str(e)))
+        return result
+
+    param_issues, params = check_params(param_tokens, values.size)
+    issues += param_issues
+    if params is not None:
+        n_vert, n_horz = params[3], params[4]
+        photometry = Photometry(
+            header_lines, tilt, params, values[:n_vert], values[n_vert:n_vert + n_horz],
+            values[n_vert + n_horz:].reshape(n_horz, n_vert), tilt_lines
+        )
+        issues += check_angles(photometry) + check_candela(photometry)
+        if not any(i["severity"] == "error" for i in issues):
+            # absolute candela = tabulated values x candela multiplier
+            candela = photometry.candela * params[2]
+            # the integration only models type C planes over 0-90/180/360; elsewhere lumens are not reported or checked
+            symmetry_factor = symmetry_factor_for(photometry)
+            calculated_lumens = float(lumens_from_arrays(photometry.vertical_angles, photometry.horizontal_angles, candela,
+                                                         symmetry_factor)) if symmetry_factor else None
+            if calculated_lumens is not None:
+                issues += check_lumens(photometry, calculated_lumens)
+            result["summary"] = {
+                "n_vert": n_vert,
+                "n_horz": n_horz,
+                "input_watts": photometry.input_watts,
+                "length_m": photometry.length_m,
+                "calculated_lumens": calculated_lumens,
+                "peak_cd": float(candela.max()),
+            }
+
+    result["issues"] = issues
+    result["valid"] = not any(i["severity"] == "error" for i in issues)
+    return result
+
+
+def _validate_bytes(item: Tuple[str, bytes]) -> Dict[str, Any]:
+    name, raw = item
+    return validate_ies_content(name, decode_ies_bytes(raw))
+
+
+def iter_ies_sources(path: str) -> Iterator[Tuple[str, bytes]]:
+    """Yield (name, raw bytes) for every .ies file in a folder tree or ZIP archive."""
+    if zipfile.is_zipfile(path):
+        with zipfile.ZipFile(path) as archive:
+            for member in archive.namelist():
+                if member.lower().endswith(".ies"):
+                    yield member, archive.read(member)
+    elif os.path.isdir(path):
+        for root, _, files in os.walk(path):
+            for filename in sorted(files):
+                if filename.lower().endswith(".ies"):
+                    full_path = os.path.join(root, filename)
+                    with open(full_path, 'rb') as f:
+                        yield os.path.relpath(full_path, path), f.read()
+    elif os.path.isfile(path):
+        with open(path, 'rb') as f:
+            yield os.path.basename(path), f.read()
+    else:
+        raise FileNotFoundError(path)
+
+
+def validate_path(path: str, max_workers: Optional[int] = None, chunksize: int = 16) -> Dict[str, Any]:
+    sources = list(iter_ies_sources(path))
+    if len(sources) > 1 and max_workers != 1:
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            results = list(pool.map(_validate_bytes, sources, chunksize=chunksize))
+    else:
+        results = [_validate_bytes(item) for item in sources]
+
+    return {
+        "source": os.path.abspath(path),
+        "generated": datetime.now().isoformat(timespec='seconds'),
+        "file_count": len(results),
+        "valid_count": sum(r["valid"] for r in results),
+        "error_count": sum(i["severity"] == "error" for r in results for i in r["issues"]),
+        "warning_count": sum(i["severity"] == "warning" for r in results for i in r["issues"]),
+        "files": results,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Validate IES files against LM-63 structural and numeric rules")
+    parser.add_argument("path", help="IES file, folder or ZIP archive")
+    parser.add_argument("-o", "--output", help="Write the JSON report to this file instead of stdout")
+    parser.add_argument("-j", "--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    args = parser.parse_args(argv)
+
+    report = validate_path(args.path, max_workers=args.workers)
+    report_json = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(report_json)
+    else:
+        print(report_json)
+    return 0 if report["valid_count"] == report["file_count"] else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,8 +1,10 @@
-import streamlit as st
-import pandas as pd
-from typing import Optional, Dict, Any
+from typing import TYPE_CHECKING, Optional, Dict, Any
 
-def parse_lumcat(lumcat_code: str) -> Optional[Dict[str, Any]]:
+if TYPE_CHECKING:
+    import pandas as pd
+
+def decode_lumcat(lumcat_code: str) -> Dict[str, Any]:
+    """UI-free decode; raises ValueError on a malformed code."""
     try:
         range_code, rest = lumcat_code.split('-')
         parsed = {
@@ -16,12 +18,19 @@ def parse_lumcat(lumcat_code: str) -> Optional[Dict[str, Any]]:
             "CCT Code": rest[12:14]
         }
         parsed['Lumens Derived Display'] = round(float(parsed["Lumens Code"]) * 10, 1)
-        return parsed
+    except (AttributeError, IndexError, ValueError) as e:
+        raise ValueError(f"Malformed LUMCAT code '{lumcat_code}': {e}") from None
+    return parsed
+
+def parse_lumcat(lumcat_code: str) -> Optional[Dict[str, Any]]:
+    try:
+        return decode_lumcat(lumcat_code)
     except Exception as e:
+        import streamlit as st  # only the error path needs the UI; keeps this module importable without it
         st.error(f"Error parsing LUMCAT: {e}")
         return None
 
-def lookup_lumcat_descriptions(parsed_codes: Dict[str, Any], matrix_df: pd.DataFrame) -> Optional[Dict[str, str]]:
+def lookup_lumcat_descriptions(parsed_codes: Dict[str, Any], matrix_df: "pd.DataFrame") -> Optional[Dict[str, str]]:
     if matrix_df.empty or parsed_codes is None:
         return None
 
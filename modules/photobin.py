@@ -0,0 +1,169 @@
+import argparse
+import json
+import struct
+import zlib
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from modules.ies_parser import PHOTOMETRIC_PARAM_COUNT, Photometry, decode_ies_bytes, parse_ies_arrays, write_ies
+
+# Layout: fixed header | text block (padded to 8 bytes) | payload = vertical, horizontal, candela (row-major n_horz x n_vert)
+MAGIC = b'LSPB'
+FORMAT_VERSION = 1
+HEADER = struct.Struct(f'<4sHBBHxxIIIQ{PHOTOMETRIC_PARAM_COUNT}d')
+COMPRESSION_CODES = {None: 0, 'deflate': 1, 'zstd': 2}
+DTYPES = {4: np.dtype('<f4'), 8: np.dtype('<f8')}
+FILE_EXTENSION = '.lspb'
+TEXT_SEPARATOR = '\0'
+
+
+def _pad8(n: int) -> int:
+    return -n % 8
+
+
+def _zstd():
+    try:
+        import zstandard
+    except ImportError:
+        raise ValueError("zstd compression requires the 'zstandard' package")
+    return zstandard
+
+
+def _compress(payload: bytes, compression: Optional[str]) -> bytes:
+    if compression == 'deflate':
+        return zlib.compress(payload, 6)
+    if compression == 'zstd':
+        return _zstd().ZstdCompressor(level=3).compress(payload)
+    return payload
+
+
+def _decompress(payload: memoryview, code: int, size: int) -> memoryview:
+    if code == COMPRESSION_CODES['deflate']:
+        return memoryview(zlib.decompress(payload))
+    if code == COMPRESSION_CODES['zstd']:
+        return memoryview(_zstd().ZstdDecompressor().decompress(payload, max_output_size=size))
+    return payload
+
+
+# === ENCODE ===
+def dumps_photometry(photometry: Photometry, dtype: Any = np.float64, compression: Optional[str] = None,
+                     metadata: Optional[Dict[str, Any]] = None) -> bytes:
+    """Binary container for one photometry; float64 without compression round-trips exactly."""
+    if compression not in COMPRESSION_CODES:
+        raise ValueError(f"Unknown compression '{compression}' (expected one of: deflate, zstd)")
+    dtype = np.dtype(dtype).newbyteorder('<')
+    if dtype.itemsize not in DTYPES or dtype.kind != 'f':
+        raise ValueError(f"Unsupported array dtype {dtype} (expected float32 or float64)")
+
+    params = photometry.photometric_params
+    if len(params) != PHOTOMETRIC_PARAM_COUNT:
+        raise ValueError(f"Expected {PHOTOMETRIC_PARAM_COUNT} photometric parameters, got {len(params)}")
+    int_mask = sum(1 << i for i, p in enumerate(params) if isinstance(p, int))
+
+    # header lines, TILT and tilt lines as plain text (no JSON decode on load); the metadata dict is JSON only if present
+    meta = TEXT_SEPARATOR.join((
+        "\n".join(photometry.header_lines),
+        photometry.tilt,
+        "\n".join(photometry.tilt_lines),
+        json.dumps(metadata) if metadata else "",
+    )).encode('utf-8')
+    payload = b''.join(np.ascontiguousarray(a, dtype=dtype).tobytes() for a in
+                       (photometry.vertical_angles, photometry.horizontal_angles, photometry.candela))
+    stored = _compress(payload, compression)
+
+    header = HEADER.pack(MAGIC, FORMAT_VERSION, dtype.itemsize, COMPRESSION_CODES[compression], int_mask,
+                         photometry.n_vert, photometry.n_horz, len(meta), len(stored), *map(float, params))
+    return b''.join((header, meta, b'\0' * _pad8(len(meta)), stored))
+
+
+# === DECODE ===
+def _read_header(buffer: memoryview) -> Tuple[tuple, Dict[str, Any], int]:
+    if len(buffer) < HEADER.size:
+        raise ValueError("Truncated photometry container")
+    fields = HEADER.unpack_from(buffer)
+    magic, version, itemsize, compression, _, _, _, meta_len, stored_len = fields[:9]
+    if magic != MAGIC:
+        raise ValueError("Not a photometry container (bad magic)")
+    if version != FORMAT_VERSION:
+        raise ValueError(f"Unsupported photometry container version {version}")
+    if itemsize not in DTYPES or compression not in COMPRESSION_CODES.values():
+        raise ValueError("Corrupt photometry container header")
+    if len(buffer) < HEADER.size + meta_len:
+        raise ValueError("Truncated photometry container")
+    header_text, tilt, tilt_text, metadata = str(buffer[HEADER.size:HEADER.size + meta_len], 'utf-8').split(TEXT_SEPARATOR)
+    meta = {
+        "header_lines": header_text.split("\n") if header_text else [],
+        "tilt": tilt,
+        "tilt_lines": tilt_text.split("\n") if tilt_text else [],
+        "metadata": json.loads(metadata) if metadata else {},
+    }
+    payload_offset = HEADER.size + meta_len + _pad8(meta_len)
+    if len(buffer) < payload_offset + stored_len:
+        raise ValueError("Truncated photometry container")
+    return fields, meta, payload_offset
+
+
+def read_metadata(data: bytes) -> Dict[str, Any]:
+    """Just the metadata dictionary, without touching the arrays."""
+    return _read_header(memoryview(data))[1]["metadata"]
+
+
+def loads_photometry(data: bytes) -> Tuple[Photometry, Dict[str, Any]]:
+    """(photometry, metadata). Uncompressed arrays are read-only views onto `data` (no copy, no parsing)."""
+    buffer = memoryview(data)
+    fields, meta, payload_offset = _read_header(buffer)
+    _, _, itemsize, compression, int_mask, n_vert, n_horz, _, stored_len = fields[:9]
+    params = [int(p) if int_mask & (1 << i) else p for i, p in enumerate(fields[9:])]
+
+    count = n_vert + n_horz + n_vert * n_horz
+    payload = _decompress(buffer[payload_offset:payload_offset + stored_len], compression, count * itemsize)
+    if len(payload) != count * itemsize:
+        raise ValueError("Photometry container payload does not match its header")
+
+    values = np.frombuffer(payload, dtype=DTYPES[itemsize], count=count)
+    photometry = Photometry(meta["header_lines"], meta["tilt"], params, values[:n_vert], values[n_vert:n_vert + n_horz],
+                            values[n_vert + n_horz:].reshape(n_horz, n_vert), meta["tilt_lines"])
+    return photometry, meta["metadata"]
+
+
+# === FILES / IES CONVERSION ===
+def save_photometry(path: str, photometry: Photometry, **kwargs) -> None:
+    with open(path, 'wb') as f:
+        f.write(dumps_photometry(photometry, **kwargs))
+
+
+def load_photometry(path: str) -> Tuple[Photometry, Dict[str, Any]]:
+    with open(path, 'rb') as f:
+        return loads_photometry(f.read())
+
+
+def ies_to_binary(file_content: str, **kwargs) -> bytes:
+    return dumps_photometry(parse_ies_arrays(file_content), **kwargs)
+
+
+def binary_to_ies(data: bytes) -> str:
+    return write_ies(loads_photometry(data)[0])
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=f"Convert between IES and the binary photometry container ({FILE_EXTENSION})")
+    parser.add_argument("src", help=f"Input .ies or {FILE_EXTENSION} file")
+    parser.add_argument("dst", help="Output file")
+    parser.add_argument("--compression", choices=['deflate', 'zstd'], default=None)
+    parser.add_argument("--float32", action='store_true', help="Store arrays as float32 (smaller, not lossless)")
+    args = parser.parse_args(argv)
+
+    with open(args.src, 'rb') as f:
+        data = f.read()
+    if args.src.lower().endswith(FILE_EXTENSION):
+        with open(args.dst, 'w') as f:
+            f.write(binary_to_ies(data))
+    else:
+        with open(args.dst, 'wb') as f:
+            f.write(ies_to_binary(decode_ies_bytes(data), dtype=np.float32 if args.float32 else np.float64,
+                                  compression=args.compression))
+
+
+if __name__ == "__main__":
+    main()
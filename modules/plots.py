@@ -0,0 +1,142 @@
+import io
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Sequence, Tuple
+
+import numpy as np
+
+from modules.ies_parser import Photometry, photometry_hash
+
+DEFAULT_C_PLANES = (0.0, 90.0)
+MAX_POLAR_POINTS = 360
+MAX_HEATMAP_SIZE = (180, 360)  # (C-planes, gamma angles) drawn at most
+CACHE_SIZE = 64
+
+_series_cache: "OrderedDict[Hashable, Any]" = OrderedDict()
+_figure_cache: "OrderedDict[Hashable, bytes]" = OrderedDict()
+
+
+def _cached(cache: "OrderedDict[Hashable, Any]", key: Hashable, build: Callable[[], Any]) -> Any:
+    if key in cache:
+        cache.move_to_end(key)
+        return cache[key]
+    value = build()
+    cache[key] = value
+    if len(cache) > CACHE_SIZE:
+        cache.popitem(last=False)
+    return value
+
+
+def clear_plot_cache() -> None:
+    _series_cache.clear()
+    _figure_cache.clear()
+
+
+def decimate_indices(n: int, max_points: int) -> np.ndarray:
+    if n <= max_points:
+        return np.arange(n)
+    return np.unique(np.linspace(0, n - 1, max_points).round().astype(int))
+
+
+def plane_index(horizontal_angles: np.ndarray, c_angle: float) -> int:
+    """Nearest measured plane for a C-angle, folding by the symmetry implied by the last horizontal angle."""
+    last = horizontal_angles[-1]
+    c = c_angle % 360.0
+    if last == 0.0:
+        return 0
+    if last == 90.0:
+        c = c % 180.0
+        c = 180.0 - c if c > 90.0 else c
+    elif last == 180.0 and c > 180.0:
+        c = 360.0 - c
+    return int(np.abs(horizontal_angles - c).argmin())
+
+
+# === PLOT DATA (CACHED BY CONTENT HASH) ===
+def polar_series(photometry: Photometry, c_planes: Sequence[float] = DEFAULT_C_PLANES, max_points: int = MAX_POLAR_POINTS,
+                 content_hash: Optional[str] = None) -> Dict[float, Tuple[np.ndarray, np.ndarray]]:
+    """Full polar curve per C-plane: the plane on one side, its C+180 partner mirrored on the other."""
+    content_hash = content_hash or photometry_hash(photometry)
+    key = ("polar", content_hash, tuple(c_planes), max_points)
+
+    def build() -> Dict[float, Tuple[np.ndarray, np.ndarray]]:
+        gamma = np.radians(photometry.vertical_angles)
+        keep = decimate_indices(gamma.size, max(2, max_points // 2))
+        series = {}
+        for c_angle in c_planes:
+            near = photometry.candela[plane_index(photometry.horizontal_angles, c_angle), keep]
+            far = photometry.candela[plane_index(photometry.horizontal_angles, c_angle + 180.0), keep]
+            theta = np.concatenate([gamma[keep], -gamma[keep][::-1]])
+            series[c_angle] = (theta, np.concatenate([near, far[::-1]]))
+        return series
+
+    return _cached(_series_cache, key, build)
+
+
+def heatmap_grid(photometry: Photometry, max_size: Tuple[int, int] = MAX_HEATMAP_SIZE,
+                 content_hash: Optional[str] = None) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    content_hash = content_hash or photometry_hash(photometry)
+    key = ("heatmap", content_hash, tuple(max_size))
+
+    def build() -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        rows = decimate_indices(photometry.horizontal_angles.size, max_size[0])
+        cols = decimate_indices(photometry.vertical_angles.size, max_size[1])
+        return photometry.horizontal_angles[rows], photometry.vertical_angles[cols], photometry.candela[np.ix_(rows, cols)]
+
+    return _cached(_series_cache, key, build)
+
+
+# === RENDERING ===
+def _figure_to_png(fig: Any, dpi: int) -> bytes:
+    import matplotlib.pyplot as plt
+
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format='png', dpi=dpi, bbox_inches='tight')
+    plt.close(fig)
+    return buffer.getvalue()
+
+
+def render_polar(base: Photometry, c_planes: Sequence[float] = DEFAULT_C_PLANES, variants: Optional[Dict[str, Photometry]] = None,
+                 max_points: int = MAX_POLAR_POINTS, dpi: int = 100) -> bytes:
+    """PNG polar plot of the base C-planes with optimised variants overlaid as dashed curves."""
+    variants = variants or {}
+    base_hash = photometry_hash(base)
+    variant_hashes = {name: photometry_hash(v) for name, v in variants.items()}
+    key = ("polar", base_hash, tuple(variant_hashes.items()), tuple(c_planes), max_points, dpi)
+
+    def build() -> bytes:
+        import matplotlib
+        matplotlib.use('Agg')
+        import matplotlib.pyplot as plt
+
+        fig, ax = plt.subplots(subplot_kw={'projection': 'polar'}, figsize=(5, 5))
+        ax.set_theta_zero_location('S')
+        for c_angle, (theta, cd) in polar_series(base, c_planes, max_points, base_hash).items():
+            ax.plot(theta, cd, label=f"Base C{c_angle:g}")
+        for name, variant in variants.items():
+            for c_angle, (theta, cd) in polar_series(variant, c_planes, max_points, variant_hashes[name]).items():
+                ax.plot(theta, cd, linestyle='--', label=f"{name} C{c_angle:g}")
+        ax.legend(loc='upper right', bbox_to_anchor=(1.3, 1.1), fontsize='small')
+        return _figure_to_png(fig, dpi)
+
+    return _cached(_figure_cache, key, build)
+
+
+def render_heatmap(photometry: Photometry, max_size: Tuple[int, int] = MAX_HEATMAP_SIZE, dpi: int = 100) -> bytes:
+    """PNG Cartesian candela map: gamma on x, C-plane on y."""
+    content_hash = photometry_hash(photometry)
+    key = ("heatmap", content_hash, tuple(max_size), dpi)
+
+    def build() -> bytes:
+        import matplotlib
+        matplotlib.use('Agg')
+        import matplotlib.pyplot as plt
+
+        horizontal, vertical, candela = heatmap_grid(photometry, max_size, content_hash)
+        fig, ax = plt.subplots(figsize=(7, 4))
+        mesh = ax.pcolormesh(vertical, horizontal, candela, shading='nearest', cmap='inferno')
+        ax.set_xlabel("Vertical angle (°)")
+        ax.set_ylabel("C-plane (°)")
+        fig.colorbar(mesh, ax=ax, label="cd")
+        return _figure_to_png(fig, dpi)
+
+    return _cached(_figure_cache, key, build)
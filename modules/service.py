@@ -0,0 +1,303 @@
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+import pandas as pd
+
+from modules.config_registry import ConfigRegistry, get_registry
+from modules.dataset import DEFAULT_EXCEL_PATH, load_excel_dataset
+from modules.ies_parser import (
+    Photometry, decode_ies_bytes, extract_meta_dict, parse_ies_arrays, photometry_lumens, scale_to_length, write_ies
+)
+from modules.lumcat import decode_lumcat
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8502
+PARSED_CACHE_SIZE = 256
+MAX_BODY_BYTES = 20 * 1024 * 1024
+
+PHOTOMETRIC_PARAM_NAMES = [
+    "Lamps", "Lumens/Lamp", "Candela Mult.", "Vert Angles", "Horiz Angles", "Photometric Type", "Units Type",
+    "Width (m)", "Length (m)", "Height (m)", "Ballast Factor", "Future Use", "Input Watts [F]"
+]
+
+
+class HTTPError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+def _content_key(content: str) -> str:
+    return hashlib.sha1(content.encode()).hexdigest()
+
+
+# === WORKER FUNCTIONS (RUN IN THE PROCESS POOL) ===
+def _summarise(photometry: Photometry) -> Dict[str, Any]:
+    lumens = photometry_lumens(photometry)
+    watts, length_m = photometry.input_watts, photometry.length_m
+    return {
+        "meta": extract_meta_dict(photometry.header_lines),
+        "params": dict(zip(PHOTOMETRIC_PARAM_NAMES, photometry.photometric_params)),
+        "Total Lumens": lumens,
+        "Efficacy (lm/W)": round(lumens / watts, 1) if watts > 0 else 0,
+        "Lumens per Meter": round(lumens / length_m, 1) if length_m > 0 else 0,
+        "Peak Candela": float(photometry.candela.max()),
+    }
+
+
+def _generate_lengths(photometry: Photometry, lengths_m: List[float], name: str) -> Dict[str, str]:
+    stem = os.path.splitext(name)[0]
+    return {f"{stem}-{length:g}m.ies": write_ies(scale_to_length(photometry, length)) for length in lengths_m}
+
+
+# === SERVICE STATE ===
+class PhotometryService:
+    def __init__(self, base_dir: Optional[str] = None, dataset_path: Optional[str] = DEFAULT_EXCEL_PATH,
+                 max_workers: Optional[int] = None):
+        self.pool = ProcessPoolExecutor(max_workers=max_workers)
+        self.dataset: Dict[str, pd.DataFrame] = {}
+        self.registry: Optional[ConfigRegistry] = None
+        self.base_files: Dict[str, str] = {}
+        self._parsed: "OrderedDict[str, Photometry]" = OrderedDict()  # LRU for ad-hoc uploads
+        self._base_parsed: Dict[str, Photometry] = {}  # base files stay warm, never evicted
+        self._base_keys: set = set()
+        self._inflight: Dict[str, "asyncio.Future[Photometry]"] = {}
+        self.stats = {"requests": 0, "parses": 0, "cache_hits": 0, "coalesced": 0}
+
+        if dataset_path and os.path.exists(dataset_path):
+            self.dataset = load_excel_dataset(dataset_path)
+            self.registry = get_registry(self.dataset)
+        if base_dir:
+            for filename in sorted(os.listdir(base_dir)):
+                if filename.lower().endswith('.ies'):
+                    with open(os.path.join(base_dir, filename), 'rb') as f:
+                        self.base_files[filename] = decode_ies_bytes(f.read())
+        self._base_keys = {_content_key(content) for content in self.base_files.values()}
+
+    async def warm(self) -> None:
+        await asyncio.gather(*(self.get_photometry(content) for content in self.base_files.values()))
+
+    def close(self) -> None:
+        self.pool.shutdown(wait=False, cancel_futures=True)
+
+    def _resolve_content(self, payload: Dict[str, Any]) -> Tuple[str, str]:
+        if payload.get('ies'):
+            if not isinstance(payload['ies'], str):
+                raise HTTPError(400, "'ies' must be the IES file content as a string")
+            return str(payload.get('name', 'upload.ies')), payload['ies']
+        base = payload.get('base')
+        if base is not None and not isinstance(base, str):
+            raise HTTPError(400, "'base' must be a file name")
+        if base in self.base_files:
+            return base, self.base_files[base]
+        raise HTTPError(404 if base else 400, f"Unknown base file '{base}'" if base else "Provide 'ies' content or a 'base' file name")
+
+    async def get_photometry(self, content: str) -> Photometry:
+        """Parse once per distinct file: cached results are reused and concurrent requests share one parse."""
+        key = _content_key(content)
+        if key in self._base_parsed:
+            self.stats["cache_hits"] += 1
+            return self._base_parsed[key]
+        if key in self._parsed:
+            self.stats["cache_hits"] += 1
+            self._parsed.move_to_end(key)
+            return self._parsed[key]
+        if key in self._inflight:
+            self.stats["coalesced"] += 1
+            future = self._inflight[key]
+        else:
+            future = asyncio.get_running_loop().run_in_executor(self.pool, parse_ies_arrays, content)
+            self._inflight[key] = future
+            future.add_done_callback(lambda done: self._store_parsed(key, done))
+            self.stats["parses"] += 1
+        try:
+            return await asyncio.shield(future)
+        except ValueError as e:
+            raise HTTPError(422, f"Could not parse IES file: {e}")
+
+    def _store_parsed(self, key: str, future: "asyncio.Future[Photometry]") -> None:
+        self._inflight.pop(key, None)
+        if future.cancelled() or future.exception() is not None:
+            return
+        if key in self._base_keys:
+            self._base_parsed[key] = future.result()
+            return
+        self._parsed[key] = future.result()
+        if len(self._parsed) > PARSED_CACHE_SIZE:
+            self._parsed.popitem(last=False)
+
+    # === ENDPOINTS ===
+    async def handle_parse(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        name, content = self._resolve_content(payload)
+        photometry = await self.get_photometry(content)
+        return {
+            "name": name,
+            "header_lines": photometry.header_lines,
+            "photometric_params": photometry.photometric_params,
+            "vertical_angles": photometry.vertical_angles.tolist(),
+            "horizontal_angles": photometry.horizontal_angles.tolist(),
+            "candela_matrix": photometry.candela.tolist(),
+        }
+
+    async def handle_summarise(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        name, content = self._resolve_content(payload)
+        photometry = await self.get_photometry(content)
+        summary = await asyncio.get_running_loop().run_in_executor(self.pool, _summarise, photometry)
+        return {"name": name, **summary}
+
+    async def handle_lumcat(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        code = payload.get('code', '')
+        try:
+            parsed_codes = decode_lumcat(code)
+        except ValueError as e:
+            raise HTTPError(422, str(e))
+        descriptions = self.registry.describe_lumcat(parsed_codes) if self.registry else None
+        return {"code": code, "parsed": parsed_codes, "descriptions": descriptions}
+
+    async def handle_generate_lengths(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        name, content = self._resolve_content(payload)
+        try:
+            lengths_m = [float(x) for x in payload.get('lengths_m', [])]
+        except (TypeError, ValueError):
+            raise HTTPError(400, "'lengths_m' must be a list of numbers")
+        if not lengths_m or min(lengths_m) <= 0:
+            raise HTTPError(400, "Provide one or more positive 'lengths_m'")
+        photometry = await self.get_photometry(content)
+        files = await asyncio.get_running_loop().run_in_executor(self.pool, _generate_lengths, photometry, lengths_m, name)
+        return {"name": name, "files": files}
+
+    async def handle_status(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "base_files": list(self.base_files),
+            "dataset_sheets": list(self.dataset),
+            "cached": len(self._parsed),
+            "base_cached": len(self._base_parsed),
+            "inflight": len(self._inflight),
+            **self.stats,
+        }
+
+    def routes(self) -> Dict[Tuple[str, str], Callable[[Dict[str, Any]], Awaitable[Dict[str, Any]]]]:
+        return {
+            ('GET', '/status'): self.handle_status,
+            ('POST', '/parse'): self.handle_parse,
+            ('POST', '/summarise'): self.handle_summarise,
+            ('GET', '/lumcat'): self.handle_lumcat,
+            ('POST', '/lumcat'): self.handle_lumcat,
+            ('POST', '/generate-lengths'): self.handle_generate_lengths,
+        }
+
+
+# === MINIMAL HTTP/1.1 OVER ASYNCIO STREAMS ===
+async def _read_request(reader: asyncio.StreamReader) -> Tuple[str, str, Dict[str, Any]]:
+    request_line = (await reader.readline()).decode('latin-1').strip()
+    if not request_line:
+        raise ConnectionResetError
+    try:
+        method, target, _ = request_line.split(' ', 2)
+    except ValueError:
+        raise HTTPError(400, "Malformed request line")
+
+    headers = {}
+    while True:
+        line = (await reader.readline()).decode('latin-1').strip()
+        if not line:
+            break
+        key, _, value = line.partition(':')
+        headers[key.strip().lower()] = value.strip()
+
+    try:
+        length = int(headers.get('content-length', 0))
+    except ValueError:
+        raise HTTPError(400, "Content-Length must be an integer")
+    if length < 0:
+        raise HTTPError(400, "Content-Length must not be negative")
+    if length > MAX_BODY_BYTES:
+        raise HTTPError(413, "Request body too large")
+    body = await reader.readexactly(length) if length else b''
+
+    url = urlsplit(target)
+    payload: Dict[str, Any] = {k: v[-1] for k, v in parse_qs(url.query).items()}
+    if body:
+        try:
+            body = json.loads(body)
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            raise HTTPError(400, "Body must be JSON")
+        if not isinstance(body, dict):
+            raise HTTPError(400, "Body must be a JSON object")
+        payload.update(body)
+    return method.upper(), url.path, payload
+
+
+def _write_response(writer: asyncio.StreamWriter, status: int, body: Dict[str, Any]) -> None:
+    data = json.dumps(body).encode()
+    reason = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed', 413: 'Payload Too Large',
+              422: 'Unprocessable Entity', 500: 'Internal Server Error'}.get(status, '')
+    writer.write(
+        f"HTTP/1.1 {status} {reason}\r\nContent-Type: application/json\r\nContent-Length: {len(data)}\r\n"
+        f"Connection: close\r\n\r\n".encode() + data
+    )
+
+
+async def serve(service: PhotometryService, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT) -> None:
+    routes = service.routes()
+
+    async def handle_connection(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        started = time.perf_counter()
+        try:
+            method, path, payload = await _read_request(reader)
+            service.stats["requests"] += 1
+            handler = routes.get((method, path))
+            if handler is None:
+                known = any(p == path for _, p in routes)
+                raise HTTPError(405 if known else 404, f"No route for {method} {path}")
+            result = await handler(payload)
+            result["elapsed_ms"] = round((time.perf_counter() - started) * 1000, 2)
+            _write_response(writer, 200, result)
+        except HTTPError as e:
+            _write_response(writer, e.status, {"error": e.message})
+        except (ConnectionResetError, asyncio.IncompleteReadError):
+            pass
+        except Exception as e:
+            _write_response(writer, 500, {"error": str(e)})
+        finally:
+            try:
+                await writer.drain()
+            except ConnectionError:
+                pass
+            writer.close()
+
+    await service.warm()
+    server = await asyncio.start_server(handle_connection, host, port)
+    async with server:
+        await server.serve_forever()
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Local HTTP service for IES parsing, summaries, LUMCAT decoding and length generation")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--base-dir", default='.', help="Folder of base IES files kept warm in memory")
+    parser.add_argument("--dataset", default=DEFAULT_EXCEL_PATH, help="Linear_Data workbook")
+    parser.add_argument("-j", "--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    args = parser.parse_args(argv)
+
+    service = PhotometryService(args.base_dir, args.dataset, args.workers)
+    try:
+        asyncio.run(serve(service, args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        service.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+# Deliberately stdlib-only: app.py imports this before anything heavy so the first render is not held up
+
+
+class BackgroundLoad:
+    """Run a loader once in a daemon thread; the UI polls `ready` and only blocks when it needs the result."""
+
+    def __init__(self, loader: Callable[[], Any]):
+        self._loader = loader
+        self._done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[Exception] = None
+        self.started_at = time.monotonic()
+        self.elapsed: Optional[float] = None
+        threading.Thread(target=self._run, daemon=True).start()
+
+    def _run(self) -> None:
+        try:
+            self.result = self._loader()
+        except Exception as e:
+            self.error = e
+        finally:
+            self.elapsed = time.monotonic() - self.started_at
+            self._done.set()
+
+    @property
+    def ready(self) -> bool:
+        return self._done.is_set()
+
+    @property
+    def age(self) -> float:
+        """Seconds since the load finished (0 while running)."""
+        return time.monotonic() - self.started_at - self.elapsed if self.elapsed is not None else 0.0
+
+    def join(self, timeout: Optional[float] = None) -> bool:
+        return self._done.wait(timeout)
+
+    def wait(self, timeout: Optional[float] = None) -> Any:
+        if not self._done.wait(timeout):
+            raise TimeoutError(f"Background load still running after {timeout}s")
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+
+_loads: Dict[str, BackgroundLoad] = {}
+_lock = threading.Lock()
+RETRY_BACKOFF_S = 60.0
+
+
+def background_load(key: str, loader: Callable[[], Any], max_age: Optional[float] = None,
+                    reload: bool = False, retry_after: float = RETRY_BACKOFF_S) -> BackgroundLoad:
+    """Process-wide load shared by every session. A successful load is redone once older than max_age seconds;
+    a failed one is kept (so its error can be shown) until retry_after seconds have passed or reload=True."""
+    with _lock:
+        load = _loads.get(key)
+        if load is not None and load.ready:
+            stale_after = retry_after if load.error is not None else max_age
+            expired = stale_after is not None and load.age > stale_after
+        else:
+            expired = False
+        if load is None or reload or expired:
+            load = _loads[key] = BackgroundLoad(loader)
+        return load
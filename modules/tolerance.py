@@ -0,0 +1,66 @@
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_DRAWS = 100_000
+DEFAULT_DRIVER_EFFICIENCY = 0.90
+PERCENTILES = (5, 50, 95)
+
+
+@dataclass(frozen=True)
+class ToleranceSpec:
+    vf_tolerance_pct: float = 3.0           # +/- 3 sigma on string forward voltage
+    flux_bin_pct: float = 7.0               # +/- half-width of the flux bin (uniform)
+    driver_efficiency_tolerance_pct: float = 2.0  # +/- 3 sigma, percentage points
+    current_tolerance_pct: float = 5.0      # +/- driver output current tolerance (uniform)
+    flux_current_exponent: float = 0.9      # lumens ~ current ** exponent near the operating point
+
+
+@dataclass(frozen=True)
+class ToleranceConfig:
+    lumens: float
+    input_watts: float
+    vf_volts: float
+    driver_efficiency: float = DEFAULT_DRIVER_EFFICIENCY
+
+
+def simulate(configs: Dict[str, ToleranceConfig], spec: ToleranceSpec = ToleranceSpec(), draws: int = DEFAULT_DRAWS,
+             seed: Optional[int] = 0) -> Dict[str, np.ndarray]:
+    """Sample every configuration at once as (n_configs, draws) arrays."""
+    rng = np.random.default_rng(seed)
+    shape = (len(configs), draws)
+    nominal = np.array([[c.lumens, c.input_watts, c.vf_volts, c.driver_efficiency] for c in configs.values()],
+                       dtype=np.float64).reshape(-1, 4)  # keeps the (0, 4) shape when there are no configurations
+    lumens, input_watts, vf, efficiency = (nominal[:, i:i + 1] for i in range(4))
+
+    # nominal current follows app.py (input watts / Vf); sampled watts are normalised so the nominal draw reproduces the IES
+    current_nominal = input_watts / vf
+    current_scale = 1 + rng.uniform(-1, 1, shape) * spec.current_tolerance_pct / 100
+    vf_sampled = vf * (1 + rng.standard_normal(shape) * spec.vf_tolerance_pct / 300)
+    efficiency_sampled = np.clip(efficiency + rng.standard_normal(shape) * spec.driver_efficiency_tolerance_pct / 300, 0.01, 1.0)
+    flux_bin = 1 + rng.uniform(-1, 1, shape) * spec.flux_bin_pct / 100
+
+    watts_sampled = input_watts * current_scale * (vf_sampled / vf) * (efficiency / efficiency_sampled)
+    lumens_sampled = lumens * flux_bin * current_scale ** spec.flux_current_exponent
+    return {
+        "Total Lumens": lumens_sampled,
+        "Input Watts": watts_sampled,
+        "Efficacy (lm/W)": lumens_sampled / watts_sampled,
+        "Actual LED Current (mA)": current_nominal * current_scale * 1000,
+    }
+
+
+def tolerance_table(configs: Dict[str, ToleranceConfig], spec: ToleranceSpec = ToleranceSpec(), draws: int = DEFAULT_DRAWS,
+                    seed: Optional[int] = 0) -> pd.DataFrame:
+    if not configs:
+        return pd.DataFrame(columns=["Configuration", "Metric", "P5", "P50", "P95"])
+    samples = simulate(configs, spec, draws, seed)
+    rows = []
+    for metric, values in samples.items():
+        p5, p50, p95 = np.percentile(values, PERCENTILES, axis=1)
+        for i, name in enumerate(configs):
+            rows.append({"Configuration": name, "Metric": metric,
+                         "P5": round(p5[i], 1), "P50": round(p50[i], 1), "P95": round(p95[i], 1)})
+    return pd.DataFrame(rows)
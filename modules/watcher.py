@@ -0,0 +1,214 @@
+import argparse
+import hashlib
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+from modules.ies_parser import decode_ies_bytes
+from modules.ies_validator import validate_ies_content
+
+DEFAULT_INTERVAL = 2.0
+DEFAULT_DEBOUNCE = 1.0
+DEFAULT_QUEUE_SIZE = 256
+INDEX_FILENAME = '.ies_index.json'
+
+logger = logging.getLogger(__name__)
+
+
+def _process_file(path: str) -> Dict[str, Any]:
+    with open(path, 'rb') as f:
+        return validate_ies_content(os.path.basename(path), decode_ies_bytes(f.read()))
+
+
+def _file_hash(path: str) -> str:
+    with open(path, 'rb') as f:
+        return hashlib.sha1(f.read()).hexdigest()
+
+
+class FolderWatcher:
+    """Poll a folder and re-parse only new or changed .ies files (mtime/size first, then content hash)."""
+
+    def __init__(self, folder: str, index_path: Optional[str] = None, interval: float = DEFAULT_INTERVAL,
+                 debounce: float = DEFAULT_DEBOUNCE, queue_size: int = DEFAULT_QUEUE_SIZE, max_workers: Optional[int] = None):
+        self.folder = folder
+        self.index_path = index_path or os.path.join(folder, INDEX_FILENAME)
+        self.interval = interval
+        self.debounce = debounce
+        self.max_workers = max_workers or os.cpu_count() or 1
+
+        self.index: Dict[str, Dict[str, Any]] = {}
+        self._pending: Dict[str, Tuple[int, int, float]] = {}  # path -> (mtime_ns, size, first seen)
+        self._queued: set = set()
+        self._queue: "queue.Queue[Optional[Tuple[str, int, int, str, float]]]" = queue.Queue(maxsize=queue_size)
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._dirty = False
+        self._threads: List[threading.Thread] = []
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self.counters = {"scans": 0, "enqueued": 0, "processed": 0, "failed": 0, "removed": 0,
+                         "unchanged_hash": 0, "latency_last_ms": 0.0, "latency_max_ms": 0.0, "latency_total_ms": 0.0}
+        self._load_index()
+
+    # === INDEX PERSISTENCE ===
+    def _load_index(self) -> None:
+        if os.path.exists(self.index_path):
+            with open(self.index_path) as f:
+                self.index = json.load(f)
+
+    def save_index(self) -> None:
+        with self._lock:
+            if not self._dirty:
+                return
+            snapshot = json.dumps(self.index)
+            self._dirty = False
+        tmp_path = f"{self.index_path}.tmp"
+        with open(tmp_path, 'w') as f:
+            f.write(snapshot)
+        os.replace(tmp_path, self.index_path)
+
+    # === COUNTERS ===
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self.counters)
+            done = stats["processed"] + stats["failed"]
+            total_ms = stats.pop("latency_total_ms")
+            stats["latency_avg_ms"] = round(total_ms / done, 2) if done else 0.0
+            stats["queue_depth"] = self._queue.qsize()
+            stats["pending_debounce"] = len(self._pending)
+            stats["indexed"] = len(self.index)
+        return stats
+
+    # === SCANNING ===
+    def scan(self) -> int:
+        """One polling pass: debounce changed files, hash them, enqueue real changes, drop deleted ones."""
+        now = time.monotonic()
+        seen = set()
+        enqueued = 0
+        with os.scandir(self.folder) as entries:
+            for entry in entries:
+                if not entry.is_file() or not entry.name.lower().endswith('.ies'):
+                    continue
+                path = entry.path
+                seen.add(path)
+                stat = entry.stat()
+                known = self.index.get(path)
+                if path in self._queued or (known and known["mtime_ns"] == stat.st_mtime_ns and known["size"] == stat.st_size):
+                    self._pending.pop(path, None)
+                    continue
+
+                pending = self._pending.get(path)
+                if pending is None or pending[:2] != (stat.st_mtime_ns, stat.st_size):
+                    self._pending[path] = (stat.st_mtime_ns, stat.st_size, now)
+                    continue
+                if now - pending[2] < self.debounce:
+                    continue
+
+                del self._pending[path]
+                digest = _file_hash(path)
+                if known and known["hash"] == digest:
+                    with self._lock:
+                        known.update(mtime_ns=stat.st_mtime_ns, size=stat.st_size)
+                        self.counters["unchanged_hash"] += 1
+                        self._dirty = True
+                    continue
+                self._queued.add(path)
+                self._queue.put((path, stat.st_mtime_ns, stat.st_size, digest, time.monotonic()))  # blocks when full: backpressure
+                enqueued += 1
+
+        with self._lock:
+            for path in [p for p in self.index if p not in seen]:
+                del self.index[path]
+                self.counters["removed"] += 1
+                self._dirty = True
+            for path in [p for p in self._pending if p not in seen]:
+                del self._pending[path]
+            self.counters["scans"] += 1
+            self.counters["enqueued"] += enqueued
+        return enqueued
+
+    # === WORKERS ===
+    def _worker(self) -> None:
+        while True:
+            item = self._queue.get()
+            if item is None:
+                self._queue.task_done()
+                return
+            path, mtime_ns, size, digest, enqueued_at = item
+            try:
+                result = self._pool.submit(_process_file, path).result()
+                failed = False
+            except Exception as e:
+                logger.warning("Failed to process %s: %s", path, e)
+                result, failed = None, True
+            latency_ms = (time.monotonic() - enqueued_at) * 1000
+            with self._lock:
+                self._queued.discard(path)
+                if result is not None:
+                    self.index[path] = {"mtime_ns": mtime_ns, "size": size, "hash": digest, "valid": result["valid"],
+                                        "summary": result["summary"], "issues": result["issues"]}
+                    self._dirty = True
+                self.counters["failed" if failed else "processed"] += 1
+                self.counters["latency_last_ms"] = round(latency_ms, 2)
+                self.counters["latency_max_ms"] = round(max(self.counters["latency_max_ms"], latency_ms), 2)
+                self.counters["latency_total_ms"] += latency_ms
+            self._queue.task_done()
+
+    def start(self) -> None:
+        self._pool = ProcessPoolExecutor(max_workers=self.max_workers)
+        self._threads = [threading.Thread(target=self._worker, daemon=True) for _ in range(self.max_workers)]
+        for thread in self._threads:
+            thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        for _ in self._threads:
+            self._queue.put(None)
+        for thread in self._threads:
+            thread.join()
+        if self._pool:
+            self._pool.shutdown()
+        self.save_index()
+
+    def drain(self) -> None:
+        self._queue.join()
+
+    def run_forever(self, report_every: float = 30.0) -> None:
+        self.start()
+        last_report = time.monotonic()
+        try:
+            while not self._stop.is_set():
+                self.scan()
+                self.save_index()
+                if time.monotonic() - last_report >= report_every:
+                    logger.info("watcher stats: %s", self.stats())
+                    last_report = time.monotonic()
+                self._stop.wait(self.interval)
+        finally:
+            self.stop()
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Watch a folder and incrementally re-index new or changed IES files")
+    parser.add_argument("folder", help="Folder the photometry lab drops IES files into")
+    parser.add_argument("--index", help=f"Index JSON path (default: <folder>/{INDEX_FILENAME})")
+    parser.add_argument("--interval", type=float, default=DEFAULT_INTERVAL, help="Seconds between polls")
+    parser.add_argument("--debounce", type=float, default=DEFAULT_DEBOUNCE, help="Seconds a file must be unchanged before parsing")
+    parser.add_argument("--queue-size", type=int, default=DEFAULT_QUEUE_SIZE, help="Maximum queued files")
+    parser.add_argument("-j", "--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    watcher = FolderWatcher(args.folder, args.index, args.interval, args.debounce, args.queue_size, args.workers)
+    try:
+        watcher.run_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()